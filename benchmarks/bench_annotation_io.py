@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import argparse
+import tempfile
+
+import numpy as np
+
+from matplotlib.path import Path
+
+# import user defined functions
+from src.annotation_io import save_annotations, load_annotations, FORMAT_EXTENSIONS
+from benchmarks.common import time_func
+
+# (landmarks, cine frames, rois, vertices per roi) of typical sessions
+CASE_LST = [(5, 20, 2, 100), (20, 20, 6, 400), (40, 30, 12, 1000)]
+
+def make_annotations(n_landmarks, cine_series, n_rois, n_verts, rng):
+    """
+    OUTPUT:
+        annotations in the .hd format with every cine frame marked
+    """
+    data_dict = {
+        "slice_location": {},
+        "point_locations": {},
+        "vert_data": {},
+        "roi_bounds": {},
+    }
+
+    for i in range(n_landmarks):
+        for j in range(cine_series):
+            key = "LANDMARK{}_{}".format(i, j)
+            data_dict["point_locations"][key] = tuple(rng.uniform(0, 256, 2).tolist())
+            data_dict["slice_location"][key] = int(rng.integers(0, 12))
+
+    for i in range(n_rois):
+        key = "ROI{}".format(i)
+        angle = np.linspace(0, 2 * np.pi, n_verts, endpoint=False)
+        verts = np.stack([128 + 20 * np.cos(angle), 128 + 20 * np.sin(angle)], axis=-1)
+        data_dict["vert_data"][key] = Path(verts + rng.normal(0, 1, verts.shape))
+        data_dict["slice_location"][key] = int(rng.integers(0, 12))
+        data_dict["roi_bounds"][key] = 0
+
+    return data_dict
+
+def is_equal(data_dict, loaded_dict):
+    """
+    OUTPUT:
+        True if the loaded annotations match the saved ones
+    """
+    for name in ["slice_location", "point_locations", "roi_bounds"]:
+        if data_dict[name] != loaded_dict[name]:
+            return False
+
+    for key, verts in data_dict["vert_data"].items():
+        if not np.array_equal(verts.vertices, loaded_dict["vert_data"][key].vertices):
+            return False
+
+    return True
+
+def main():
+    # pass command line args
+    cmd_parse = argparse.ArgumentParser(description = 'Compare annotation file formats')
+    cmd_parse.add_argument('-r', '--repeat', help = 'number of timing repeats', type=int, default=5)
+    cmd_args = cmd_parse.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print("{:>16} {:>6} {:>12} {:>12} {:>10} {:>6}".format(
+        "case", "format", "write (ms)", "read (ms)", "size (KB)", "equal"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for case in CASE_LST:
+            data_dict = make_annotations(*case, rng)
+
+            for fmt, ext in FORMAT_EXTENSIONS.items():
+                save_path = os.path.join(tmp_dir, "annotation" + ext)
+
+                # skip formats whose library is missing
+                try:
+                    write_time = time_func(lambda: save_annotations(save_path, data_dict), cmd_args.repeat)
+                except ImportError as e:
+                    print("{:>16} {:>6} skipped: {}".format("x".join(str(x) for x in case), fmt, e))
+                    continue
+
+                read_time = time_func(lambda: load_annotations(save_path), cmd_args.repeat)
+                equal = is_equal(data_dict, load_annotations(save_path))
+
+                print("{:>16} {:>6} {:>12.2f} {:>12.2f} {:>10.1f} {:>6}".format(
+                    "x".join(str(x) for x in case), fmt, write_time * 1000, read_time * 1000,
+                    os.path.getsize(save_path) / 2**10, str(equal)))
+
+if __name__ == '__main__':
+    main()
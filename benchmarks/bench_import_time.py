@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import sys
+import argparse
+import subprocess
+
+# repository root, where main.py is imported from
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules main.py must only import on the code paths that need them
+DEFERRED_LST = ["pandas", "scipy", "deepdish", "tables", "matplotlib"]
+
+def measure_import(module):
+    """
+    INPUT:
+        module:
+            the module to import in a fresh interpreter
+    OUTPUT:
+        dict of imported module name to cumulative import time in us
+    """
+    rslt = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+        cwd=ROOT_PATH, capture_output=True, text=True,
+    )
+    if rslt.returncode != 0:
+        raise RuntimeError("Problem importing {}:\n{}".format(module, rslt.stderr))
+
+    # lines are "import time: self [us] | cumulative | imported package"
+    time_dict = {}
+    for line in rslt.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line[len("import time:"):].split("|")
+        try:
+            time_dict[fields[2].strip()] = int(fields[1])
+        except ValueError:
+            continue
+
+    return time_dict
+
+def main():
+    # pass command line args
+    cmd_parse = argparse.ArgumentParser(description = 'Check the import time of main.py against a budget')
+    cmd_parse.add_argument('-m', '--module', help = 'module to import', type=str, default='main')
+    cmd_parse.add_argument('-b', '--budget', help = 'import time budget in ms', type=float, default=400)
+    cmd_parse.add_argument('-r', '--repeat', help = 'number of timing repeats', type=int, default=5)
+    cmd_parse.add_argument('-t', '--top', help = 'number of slowest imports to list', type=int, default=10)
+    cmd_args = cmd_parse.parse_args()
+
+    # best of repeats; the first run also warms the file cache
+    time_lst = [measure_import(cmd_args.module) for _ in range(cmd_args.repeat + 1)]
+    time_dict = min(time_lst[1:] or time_lst, key=lambda x: x[cmd_args.module])
+    total = time_dict[cmd_args.module] / 1000
+
+    # slowest top level imports of the module
+    print("{:>40} {:>12}".format("module", "cumulative (ms)"))
+    for name, us in sorted(time_dict.items(), key=lambda x: -x[1])[:cmd_args.top]:
+        print("{:>40} {:>12.1f}".format(name, us / 1000))
+
+    # heavy modules imported too early
+    deferred_lst = [x for x in DEFERRED_LST if x in time_dict]
+
+    print("\nimport {}: {:.1f} ms of {:.1f} ms budget".format(cmd_args.module, total, cmd_args.budget))
+    if deferred_lst:
+        print("imported at startup: {}".format(", ".join(deferred_lst)))
+
+    if total > cmd_args.budget or deferred_lst:
+        print("FAIL")
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+# import libraries
+import argparse
+
+import numpy as np
+
+# import user defined functions
+from src.process_roi import get_roi_mask, roi_mask_to_indicies
+from src.process_calcium import mask_matrix, mask_matrix_from_roi
+from benchmarks.common import time_func, make_lasso
+
+# (lasso radius in pixels, slices) of typical coronary ROIs
+CROP_LST = [(10, 10), (20, 30), (40, 60), (60, 120)]
+
+def tuple_mask_matrix(mtx, roi_indx_lst):
+    """
+    OUTPUT:
+        the previous set difference based mask_matrix
+    """
+    roi_mtx = np.stack(roi_indx_lst)
+    min_vals = roi_mtx.min(axis=0)
+    roi_mtx = roi_mtx - min_vals
+    roi_mtx = np.stack([roi_mtx[:, 1], roi_mtx[:, 0], roi_mtx[:, 2]]).T
+
+    bins = np.indices(mtx.shape)
+    pos = np.stack(bins, axis=-1).reshape([-1, 3])
+
+    roi_tpl_lst = [tuple(x) for x in roi_mtx.tolist()]
+    pos_tpl_lst = [tuple(x) for x in pos.tolist()]
+
+    diff_set = set(pos_tpl_lst).difference(roi_tpl_lst)
+    not_in_roi_mtx = np.stack(list(diff_set))
+
+    # tuple index; a list of lists is no longer treated as one by numpy
+    mskd_mtx = mtx.copy()
+    mskd_mtx[tuple(not_in_roi_mtx.T)] = 0
+
+    return mskd_mtx
+
+def make_crop(radius, n_slices, rng):
+    """
+    OUTPUT:
+        [0] roi_mask:
+            RoiMask of an irregular lasso in a 512x512 image
+        [1] crop:
+            HU matrix cropped to the roi
+    """
+    roi_mask = get_roi_mask(make_lasso((256, 256), radius), (512, 512), (100, 100 + n_slices))
+
+    # crop dims of roi pixels
+    y_indx, x_indx = np.nonzero(roi_mask.mask)
+    shape = (np.ptp(x_indx) + 1, np.ptp(y_indx) + 1, n_slices)
+    crop = rng.normal(0, 200, size=shape)
+
+    return roi_mask, crop
+
+def main():
+    # pass command line args
+    cmd_parse = argparse.ArgumentParser(description = 'Compare tuple and boolean mask ROI masking')
+    cmd_parse.add_argument('-r', '--repeat', help = 'number of timing repeats', type=int, default=3)
+    cmd_args = cmd_parse.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print("{:>14} {:>10} {:>12} {:>12} {:>12} {:>8} {:>6}".format(
+        "crop", "voxels", "tuple (ms)", "bool (ms)", "roi (ms)", "speedup", "equal"))
+    for radius, n_slices in CROP_LST:
+        roi_mask, crop = make_crop(radius, n_slices, rng)
+        roi_indx_lst = roi_mask_to_indicies(roi_mask)
+
+        tuple_time = time_func(lambda: tuple_mask_matrix(crop, roi_indx_lst), cmd_args.repeat)
+        bool_time = time_func(lambda: mask_matrix(crop, roi_indx_lst), cmd_args.repeat)
+        roi_time = time_func(lambda: mask_matrix_from_roi(crop, roi_mask), cmd_args.repeat)
+
+        expected = tuple_mask_matrix(crop, roi_indx_lst)
+        equal = (
+            np.array_equal(expected, mask_matrix(crop, roi_indx_lst)) and
+            np.array_equal(expected, mask_matrix_from_roi(crop, roi_mask))
+        )
+
+        print("{:>14} {:>10} {:>12.2f} {:>12.2f} {:>12.2f} {:>8.0f} {:>6}".format(
+            "x".join(str(x) for x in crop.shape), crop.size, tuple_time * 1000, bool_time * 1000,
+            roi_time * 1000, tuple_time / roi_time, str(equal)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+# import libraries
+import argparse
+
+import numpy as np
+
+from math import floor, ceil
+from scipy.interpolate import splev, splrep
+
+# import user defined functions
+from src.interpolation import batch_interpolate
+from benchmarks.common import time_func
+
+FRAME_LST = [20, 30, 40, 50]
+TRAJECTORY_LST = [1, 10, 100, 1000]
+
+def tiled_spline(x, y, t_max, times = 6):
+    """
+    INPUTS:
+        x:
+            known frames
+        y:
+            values at x
+        t_max:
+            number of frames
+    OUTPUT:
+        the previous periodic mode; splrep over the samples tiled times periods
+    """
+    pre_periods = ceil(times/2)
+    after_periods = floor(times/2)
+
+    x_conc = np.concatenate([x + _ for _ in (t_max * np.arange(-pre_periods, after_periods))])
+    y_conc = np.concatenate([y] * times)
+
+    spl = splrep(x_conc, y_conc)
+    return splev(np.arange(0, t_max), spl)
+
+def main():
+    # pass command line args
+    cmd_parse = argparse.ArgumentParser(description = 'Compare tiled and closed form periodic splines')
+    cmd_parse.add_argument('-r', '--repeat', help = 'number of timing repeats', type=int, default=3)
+    cmd_parse.add_argument('-k', '--known', help = 'fraction of annotated frames', type=float, default=0.3)
+    cmd_args = cmd_parse.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print("{:>6} {:>6} {:>12} {:>12} {:>8} {:>10}".format("frames", "traj", "tiled (ms)", "closed (ms)", "speedup", "max diff"))
+    for t_max in FRAME_LST:
+        for n_traj in TRAJECTORY_LST:
+            # same annotated frames for every trajectory, as for one landmark's axes
+            n_known = max(4, int(cmd_args.known * t_max))
+            x = np.sort(rng.choice(t_max, n_known, replace=False))
+            mask = np.zeros([n_traj, t_max], dtype=bool)
+            mask[:, x] = True
+            value_ary = rng.normal(size=[n_traj, t_max]).cumsum(axis=-1)
+
+            tiled_func = lambda: [tiled_spline(x, y[x], t_max) for y in value_ary]
+            closed_func = lambda: batch_interpolate(value_ary, mask, type="periodic")
+
+            tiled_time = time_func(tiled_func, cmd_args.repeat)
+            closed_time = time_func(closed_func, cmd_args.repeat)
+            max_diff = np.abs(np.stack(tiled_func()) - closed_func()).max()
+
+            print("{:>6} {:>6} {:>12.3f} {:>12.3f} {:>8.1f} {:>10.2e}".format(
+                t_max, n_traj, tiled_time * 1000, closed_time * 1000, tiled_time / closed_time, max_diff))
+
+if __name__ == '__main__':
+    main()
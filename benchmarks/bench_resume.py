@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import time
+import argparse
+import tempfile
+
+import yaml
+import numpy as np
+import matplotlib
+
+matplotlib.use("Agg")
+
+from pydicom.dataset import Dataset
+from matplotlib import pyplot
+
+# import user defined functions
+from src.renderDicom import RenderDicomSeries
+
+# (point landmarks, cine frames, marked frames per landmark) of resumed cases
+CASE_LST = [(5, 20, 2), (10, 20, 4), (20, 30, 6), (40, 30, 10)]
+
+N_SLICES = 12
+ROI_LST = ["LAD1", "RCA1"]
+
+class PerLandmarkRenderer(RenderDicomSeries):
+    """
+    renderer that draws after restoring each landmark, as startup did before
+    the bulk restore
+    """
+    def _update_predicted_points(self, landmark, frame_ary, redraw=True):
+        RenderDicomSeries._update_predicted_points(self, landmark, frame_ary, True)
+
+def write_settings(settings_path, n_landmarks):
+    """
+    EFFECT:
+        writes a settings file with n_landmarks points and two rois
+    """
+    landmark_lst = ["POINT{}".format(i) for i in range(n_landmarks)] + ROI_LST
+    settings = {
+        "anatomic_landmarks": {"k{}".format(i): x for i, x in enumerate(landmark_lst)},
+        "roi_landmarks": ["LAD", "RCA"],
+    }
+
+    with open(settings_path, "w") as f:
+        yaml.safe_dump(settings, f)
+
+def make_series(cine_series):
+    """
+    OUTPUT:
+        [0] dicom_lst:
+            header only datasets of a cine series
+        [1] volume:
+            blank (slice, cine, rows, cols) images
+    """
+    dicom_lst = []
+    for _ in range(N_SLICES * cine_series):
+        ds = Dataset()
+        ds.CardiacNumberOfImages = cine_series
+        dicom_lst.append(ds)
+
+    volume = np.zeros([N_SLICES, cine_series, 256, 256], dtype=np.int16)
+
+    return dicom_lst, volume
+
+def make_annotations(n_landmarks, cine_series, n_marked, rng):
+    """
+    OUTPUT:
+        saved annotations with n_marked frames of every landmark marked
+    """
+    data_dict = {
+        "slice_location": {},
+        "point_locations": {},
+        "vert_data": {},
+        "roi_bounds": {},
+    }
+
+    for i in range(n_landmarks):
+        marked = set(rng.choice(cine_series, n_marked, replace=False).tolist())
+        for j in range(cine_series):
+            key = "POINT{}_{}".format(i, j)
+            if j in marked:
+                data_dict["point_locations"][key] = tuple(rng.uniform(0, 256, 2).tolist())
+                data_dict["slice_location"][key] = int(rng.integers(0, N_SLICES))
+            else:
+                data_dict["point_locations"][key] = None
+                data_dict["slice_location"][key] = None
+
+    angle = np.linspace(0, 2 * np.pi, 100, endpoint=False)
+    for key in ROI_LST:
+        verts = np.stack([128 + 20 * np.cos(angle), 128 + 20 * np.sin(angle)], axis=-1)
+        data_dict["vert_data"][key] = verts
+        data_dict["slice_location"][key] = 0
+        data_dict["roi_bounds"][key] = 0
+
+    return data_dict
+
+def time_to_interactive(renderer_cls, dicom_lst, volume, settings_path, data_dict):
+    """
+    OUTPUT:
+        [0] seconds until the resumed case is drawn
+        [1] number of full draws and blitted frames
+    """
+    fig, ax = pyplot.subplots(1)
+
+    draw_lst = []
+    fig.canvas.mpl_connect("draw_event", lambda event: draw_lst.append(event))
+
+    # blitted frames restore the background first
+    restore_region = fig.canvas.restore_region
+    def count_restore(region):
+        draw_lst.append(region)
+        restore_region(region)
+    fig.canvas.restore_region = count_restore
+
+    # fresh copy since the renderer edits the annotations
+    data_dict = {k: dict(v) for k, v in data_dict.items()}
+
+    start = time.perf_counter()
+    renderer_cls(ax, dicom_lst, settings_path, data_dict, volume)
+    elapsed = time.perf_counter() - start
+
+    pyplot.close(fig)
+
+    return elapsed, len(draw_lst)
+
+def main():
+    # pass command line args
+    cmd_parse = argparse.ArgumentParser(description = 'Time to interactive of resumed cases')
+    cmd_parse.add_argument('-r', '--repeat', help = 'number of timing repeats', type=int, default=3)
+    cmd_args = cmd_parse.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print("{:>12} {:>16} {:>8} {:>12} {:>8} {:>8}".format(
+        "case", "per landmark (ms)", "frames", "bulk (ms)", "frames", "speedup"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings_path = os.path.join(tmp_dir, "settings.yaml")
+
+        for n_landmarks, cine_series, n_marked in CASE_LST:
+            write_settings(settings_path, n_landmarks)
+            dicom_lst, volume = make_series(cine_series)
+            data_dict = make_annotations(n_landmarks, cine_series, n_marked, rng)
+
+            # best of repeats
+            rslt_dict = {}
+            for renderer_cls in [PerLandmarkRenderer, RenderDicomSeries]:
+                rslt_lst = [time_to_interactive(renderer_cls, dicom_lst, volume, settings_path, data_dict) for _ in range(cmd_args.repeat)]
+                rslt_dict[renderer_cls] = min(rslt_lst)
+
+            old_time, old_frames = rslt_dict[PerLandmarkRenderer]
+            new_time, new_frames = rslt_dict[RenderDicomSeries]
+
+            print("{:>12} {:>16.1f} {:>8} {:>12.1f} {:>8} {:>8.1f}".format(
+                "{}x{}x{}".format(n_landmarks, cine_series, n_marked), old_time * 1000, old_frames,
+                new_time * 1000, new_frames, old_time / new_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+
+# import libraries
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import contextlib
+
+import yaml
+import numpy as np
+import pydicom
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib import pyplot
+
+# import user defined functions
+from src.utility import import_dicom
+from src.renderDicom import RenderDicomSeries
+from src.interpolation import cine_interpolate, batch_cine_interpolate
+from src.process_roi import get_roi_mask, get_roi_indicies
+from src.process_calcium import get_calcium_measurements
+from benchmarks.common import time_func, make_lasso
+from benchmarks.synthetic_dicom import make_cine_study, make_ct_study
+
+# study sizes
+SIZE_DICT = {
+    "small": {
+        "cine": {"n_slices": 6, "cine_series": 20, "rows": 128, "cols": 128},
+        "ct": {"n_slices": 24, "rows": 256, "cols": 256},
+        "landmarks": 20,
+    },
+    "full": {
+        "cine": {"n_slices": 12, "cine_series": 30, "rows": 256, "cols": 256},
+        "ct": {"n_slices": 64, "rows": 512, "cols": 512},
+        "landmarks": 100,
+    },
+}
+
+SETTINGS = {
+    "anatomic_landmarks": {"a": "APEX", "b": "BASE", "c": "LAD1"},
+    "roi_landmarks": ["LAD"],
+}
+
+def bench_import(cine_path, tmp_dir, repeat):
+    """
+    OUTPUT:
+        dict of import_dicom times
+    """
+    index_path = os.path.join(tmp_dir, "cine.index.json")
+
+    # build index once so the timed run reuses it
+    import_dicom(cine_path, index_path=index_path)
+
+    return {
+        "import_dicom": time_func(lambda: import_dicom(cine_path), repeat),
+        "import_dicom_workers": time_func(lambda: import_dicom(cine_path, workers=4), repeat),
+        "import_dicom_lazy": time_func(lambda: import_dicom(cine_path, lazy=True), repeat),
+        "import_dicom_index": time_func(lambda: import_dicom(cine_path, index_path=index_path), repeat),
+    }
+
+def bench_render(cine_path, settings_path, repeat):
+    """
+    OUTPUT:
+        dict of headless viewer times; steps are per event
+    """
+    dicom_lst = import_dicom(cine_path, lazy=True)
+    cine_series = int(dicom_lst[0].CardiacNumberOfImages)
+    n_slices = len(dicom_lst) // cine_series
+
+    class Event:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    def open_viewer():
+        fig, ax = pyplot.subplots(1)
+        return RenderDicomSeries(ax, dicom_lst, settings_path)
+
+    def navigate(renderer):
+        for _ in range(n_slices - 2):
+            renderer._next_image()
+        for _ in range(cine_series):
+            renderer._advance_cine_forward()
+
+    def annotate(renderer):
+        renderer.curr_selection = "APEX"
+        for i in range(cine_series):
+            renderer._advance_cine_forward()
+            if i % 4 == 0:
+                renderer._on_click(Event(button=1, xdata=60. + i, ydata=60. - i, x=0, y=0))
+
+    # the viewer reports every event on stdout
+    rslt_dict = {"render_open": float("inf"), "render_step": float("inf"), "render_click": float("inf")}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            renderer = open_viewer()
+            rslt_dict["render_open"] = min(rslt_dict["render_open"], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            navigate(renderer)
+            step_time = (time.perf_counter() - start) / (n_slices - 2 + cine_series)
+            rslt_dict["render_step"] = min(rslt_dict["render_step"], step_time)
+
+            start = time.perf_counter()
+            annotate(renderer)
+            click_time = (time.perf_counter() - start) / cine_series
+            rslt_dict["render_click"] = min(rslt_dict["render_click"], click_time)
+
+            pyplot.close("all")
+
+    return rslt_dict
+
+def bench_interpolation(n_landmarks, cine_series, repeat, rng):
+    """
+    OUTPUT:
+        dict of cine interpolation times over all landmarks
+    """
+    coord_ary = rng.uniform(0, 256, size=(n_landmarks, cine_series, 2))
+    slice_ary = rng.integers(0, 12, size=(n_landmarks, cine_series)).astype(float)
+
+    # three to six annotated frames per landmark
+    mask = np.zeros([n_landmarks, cine_series], dtype=bool)
+    for row in mask:
+        row[rng.choice(cine_series, rng.integers(3, 7), replace=False)] = True
+
+    def loop_interpolate(type):
+        for i in range(n_landmarks):
+            t_ary = np.nonzero(mask[i])[0]
+            ijk_ary = np.column_stack([coord_ary[i, t_ary], slice_ary[i, t_ary]])
+            cine_interpolate(ijk_ary, t_ary, cine_series, type)
+
+    return {
+        "cine_interpolate_linear": time_func(lambda: loop_interpolate("linear"), repeat),
+        "cine_interpolate_periodic": time_func(lambda: loop_interpolate("periodic"), repeat),
+        "batch_cine_interpolate_linear": time_func(lambda: batch_cine_interpolate(coord_ary, slice_ary, mask, "linear"), repeat),
+        "batch_cine_interpolate_periodic": time_func(lambda: batch_cine_interpolate(coord_ary, slice_ary, mask, "periodic"), repeat),
+    }
+
+def bench_roi(ct_path, repeat):
+    """
+    OUTPUT:
+        dict of roi rasterization and calcium scoring times
+    """
+    dicom_lst = import_dicom(ct_path)
+    rows, cols = int(dicom_lst[0].Rows), int(dicom_lst[0].Columns)
+    dicom_dims = (cols, rows)
+    slice_range = (0, len(dicom_lst))
+
+    # lasso around the calcified center
+    lasso = make_lasso((cols / 2, rows / 2), min(rows, cols) * 0.15)
+
+    roi_mask = get_roi_mask(lasso, dicom_dims, slice_range)
+    roi_indx_lst = get_roi_indicies(lasso, dicom_dims, slice_range)
+
+    # decode images once
+    for dicom_slice in dicom_lst:
+        dicom_slice.pixel_array
+
+    return {
+        "get_roi_indicies": time_func(lambda: get_roi_indicies(lasso, dicom_dims, slice_range), repeat),
+        "get_roi_mask": time_func(lambda: get_roi_mask(lasso, dicom_dims, slice_range), repeat),
+        "calcium_indicies": time_func(lambda: get_calcium_measurements(roi_indx_lst, dicom_lst), repeat),
+        "calcium_slice": time_func(lambda: get_calcium_measurements(roi_mask, dicom_lst), repeat),
+        "calcium_lesion": time_func(lambda: get_calcium_measurements(roi_mask, dicom_lst, scoring="lesion"), repeat),
+    }
+
+def compare_results(rslt_dict, baseline_path, threshold):
+    """
+    INPUTS:
+        rslt_dict:
+            dict of benchmark name to seconds
+        baseline_path:
+            results json of an earlier run
+        threshold:
+            slowdown ratio reported as a regression
+    OUTPUT:
+        list of regressed benchmark names
+    """
+    with open(baseline_path, "r") as f:
+        baseline_dict = json.load(f)["results"]
+
+    regression_lst = []
+    print("\n{:>32} {:>12} {:>12} {:>8}".format("benchmark", "base (ms)", "new (ms)", "ratio"))
+    for name, new_time in rslt_dict.items():
+        if name not in baseline_dict:
+            continue
+
+        ratio = new_time / baseline_dict[name]
+        flag = ""
+        if ratio > threshold:
+            regression_lst.append(name)
+            flag = " REGRESSION"
+
+        print("{:>32} {:>12.2f} {:>12.2f} {:>8.2f}{}".format(
+            name, baseline_dict[name] * 1000, new_time * 1000, ratio, flag))
+
+    return regression_lst
+
+def main():
+    # pass command line args
+    cmd_parse = argparse.ArgumentParser(description = 'Benchmark suite on synthetic dicom studies')
+    cmd_parse.add_argument('-s', '--size', help = 'study sizes', choices=list(SIZE_DICT), default='small')
+    cmd_parse.add_argument('-r', '--repeat', help = 'number of timing repeats', type=int, default=3)
+    cmd_parse.add_argument('-o', '--out', help = 'path of results json', type=str)
+    cmd_parse.add_argument('-c', '--compare', help = 'results json of an earlier run to compare against', type=str)
+    cmd_parse.add_argument('-t', '--threshold', help = 'slowdown ratio that fails the comparison', type=float, default=1.25)
+    cmd_args = cmd_parse.parse_args()
+
+    size = SIZE_DICT[cmd_args.size]
+    rng = np.random.default_rng(0)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        # generate studies
+        cine_path = os.path.join(tmp_dir, "cine")
+        ct_path = os.path.join(tmp_dir, "ct")
+        make_cine_study(cine_path, rng=rng, **size["cine"])
+        make_ct_study(ct_path, rng=rng, **size["ct"])
+
+        settings_path = os.path.join(tmp_dir, "settings.yaml")
+        with open(settings_path, "w") as f:
+            yaml.safe_dump(SETTINGS, f)
+
+        # run benchmarks
+        rslt_dict = {}
+        rslt_dict.update(bench_import(cine_path, tmp_dir, cmd_args.repeat))
+        rslt_dict.update(bench_render(cine_path, settings_path, cmd_args.repeat))
+        rslt_dict.update(bench_interpolation(size["landmarks"], size["cine"]["cine_series"], cmd_args.repeat, rng))
+        rslt_dict.update(bench_roi(ct_path, cmd_args.repeat))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    print("{:>32} {:>12}".format("benchmark", "time (ms)"))
+    for name, seconds in rslt_dict.items():
+        print("{:>32} {:>12.2f}".format(name, seconds * 1000))
+
+    # store results
+    if cmd_args.out is not None:
+        out_data = {
+            "meta": {
+                "date": datetime.datetime.now().isoformat(),
+                "size": cmd_args.size,
+                "repeat": cmd_args.repeat,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "numpy": np.__version__,
+                "pydicom": pydicom.__version__,
+                "matplotlib": matplotlib.__version__,
+            },
+            "results": rslt_dict,
+        }
+        with open(cmd_args.out, "w") as f:
+            json.dump(out_data, f, indent=2)
+
+    # compare against an earlier run
+    if cmd_args.compare is not None:
+        regression_lst = compare_results(rslt_dict, cmd_args.compare, cmd_args.threshold)
+        if regression_lst:
+            print("regressions: {}".format(", ".join(regression_lst)))
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+# import libraries
+import time
+
+import numpy as np
+
+from matplotlib.path import Path
+
+def time_func(func, repeat):
+    """
+    OUTPUT:
+        best wall time of func in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def make_lasso(center, radius, n_verts=64):
+    """
+    OUTPUT:
+        irregular closed lasso Path around center
+    """
+    angle = np.linspace(0, 2 * np.pi, n_verts, endpoint=False)
+    rad = radius * (1 + 0.3 * np.sin(3 * angle))
+
+    return Path(np.stack([center[0] + rad * np.cos(angle), center[1] + rad * np.sin(angle)], axis=-1))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+
+import numpy as np
+
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+MR_SOP_CLASS = "1.2.840.10008.5.1.4.1.1.4"
+CT_SOP_CLASS = "1.2.840.10008.5.1.4.1.1.2"
+
+# stored value of 0 HU
+CT_INTERCEPT = -1024
+
+def write_dicom(file_path, pixel_ary, sop_class, **fields):
+    """
+    INPUTS:
+        file_path:
+            path of the dicom file
+        pixel_ary:
+            uint16 image
+        sop_class:
+            the SOP class uid
+        fields:
+            header values to set
+    EFFECT:
+        writes an explicit VR little endian dicom file
+    """
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = sop_class
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = FileDataset(file_path, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.is_little_endian = True
+    ds.is_implicit_VR = False
+
+    for name, value in fields.items():
+        setattr(ds, name, value)
+
+    # image
+    ds.Rows, ds.Columns = pixel_ary.shape
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.PixelRepresentation = 0
+    ds.PixelData = pixel_ary.astype(np.uint16).tobytes()
+
+    ds.save_as(file_path, write_like_original=False)
+
+def make_cine_study(root_path, n_slices, cine_series, rows, cols, rng):
+    """
+    INPUTS:
+        root_path:
+            directory to write the study to
+        n_slices, cine_series:
+            number of slices and cine frames per slice
+        rows, cols:
+            image shape
+        rng:
+            numpy random generator
+    OUTPUT:
+        list of written file paths; instance numbers are shuffled against
+        file names so the import has to sort
+    """
+    os.makedirs(root_path, exist_ok=True)
+
+    # beating disk on noise
+    y, x = np.mgrid[:rows, :cols]
+    instance_ary = rng.permutation(n_slices * cine_series) + 1
+
+    path_lst = []
+    for i, instance in enumerate(instance_ary):
+        cine_frame = (instance - 1) % cine_series
+        radius = min(rows, cols) * (0.2 + 0.05 * np.sin(2 * np.pi * cine_frame / cine_series))
+        disk = ((x - cols / 2)**2 + (y - rows / 2)**2) < radius**2
+        img = rng.integers(0, 200, size=(rows, cols)) + 800 * disk
+
+        file_path = os.path.join(root_path, "IM{:05d}.dcm".format(i))
+        write_dicom(file_path, img, MR_SOP_CLASS,
+            InstanceNumber=int(instance),
+            CardiacNumberOfImages=cine_series,
+            AccessionNumber="SYNTHMR",
+            PixelSpacing=[1.4, 1.4],
+            SliceThickness=8,
+        )
+        path_lst.append(file_path)
+
+    return path_lst
+
+def make_ct_study(root_path, n_slices, rows, cols, rng, n_lesions=20):
+    """
+    INPUTS:
+        root_path:
+            directory to write the study to
+        n_slices:
+            number of slices
+        rows, cols:
+            image shape
+        rng:
+            numpy random generator
+        n_lesions:
+            number of calcified spheres around the image center
+    OUTPUT:
+        list of written file paths
+    """
+    os.makedirs(root_path, exist_ok=True)
+
+    # soft tissue with calcified spheres of 150 to 600 HU
+    shape = np.array([n_slices, rows, cols])
+    hu_vol = rng.normal(40, 20, size=shape).astype(np.float32)
+    for _ in range(n_lesions):
+        center = rng.uniform([0, rows * 0.4, cols * 0.4], [n_slices, rows * 0.6, cols * 0.6])
+        radius = rng.uniform(1, 4)
+
+        # only the bounding box of the sphere
+        lo = np.maximum(np.floor(center - radius).astype(int), 0)
+        hi = np.minimum(np.ceil(center + radius).astype(int) + 1, shape)
+        z, y, x = np.ogrid[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]]
+        sphere = ((z - center[0])**2 + (y - center[1])**2 + (x - center[2])**2) < radius**2
+        hu_vol[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]][sphere] = rng.uniform(150, 600)
+
+    path_lst = []
+    for i in range(n_slices):
+        file_path = os.path.join(root_path, "CT{:05d}.dcm".format(i))
+        write_dicom(file_path, np.clip(hu_vol[i] - CT_INTERCEPT, 0, None), CT_SOP_CLASS,
+            InstanceNumber=i + 1,
+            CardiacNumberOfImages=1,
+            AccessionNumber="SYNTHCT",
+            PixelSpacing=[0.4, 0.4],
+            SliceThickness=3,
+            RescaleSlope=1,
+            RescaleIntercept=CT_INTERCEPT,
+        )
+        path_lst.append(file_path)
+
+    return path_lst
@@ -3,44 +3,194 @@
 # import libraries
 import os
 import re
+import sys
 import yaml
 import argparse
-import warnings
-
-import deepdish as dd
+import importlib
+import threading
 
 from pathlib import Path
-from matplotlib import pyplot
+from concurrent.futures import ThreadPoolExecutor
 
-# import user defined functions
+# import user defined functions; the viewer is imported by main on a thread
 from src.utility import import_dicom
-from src.renderDicom import plotDicom
+from src.series_index import get_cache_path
+from src.volume_cache import open_volume_cache, get_volume_cache_path
+from src.journal import AnnotationJournal, read_journal
+from src.annotation_io import find_annotations, load_annotations, save_annotations_async, FORMAT_EXTENSIONS
+from src.instrumentation import EventProfiler
 
 DASH_REGEX = re.compile(" - ")
 
+def read_worklist(worklist_path):
+    """
+    INPUTS:
+        worklist_path:
+            a directory of study directories, or a file with one study path
+            per line
+    OUTPUT:
+        list of study paths
+    """
+    if os.path.isdir(worklist_path):
+        return sorted(x.path for x in os.scandir(worklist_path) if x.is_dir())
+
+    with open(worklist_path, "r") as f:
+        return [x.strip() for x in f if x.strip() and not x.startswith("#")]
+
+def prepare_study(input_path, cmd_args):
+    """
+    INPUTS:
+        input_path:
+            path for input dicom files
+        cmd_args:
+            parsed command line args
+    OUTPUT:
+        dict of the imported series and its annotation paths and data
+    """
+    # determine series index path
+    if cmd_args.index:
+        index_path = get_cache_path(cmd_args.save_path, input_path, ".index.json")
+    else:
+        index_path = None
+
+    # import dicom
+    dicom_lst = import_dicom(input_path, cmd_args.workers, cmd_args.lazy, index_path)
+
+    # get a unique id
+    if dicom_lst[0].AccessionNumber:
+        p = Path(input_path)
+        u_id = "{}_{}".format(dicom_lst[0].AccessionNumber, p.name)
+    else:
+        p = Path(input_path)
+        u_id = p.name
+
+    # make annotation out path
+    save_path = os.path.join(cmd_args.save_path, u_id + FORMAT_EXTENSIONS[cmd_args.format])
+
+    # test to see if old annotation exists, saved in any format
+    old_path = find_annotations(save_path)
+    if old_path is not None:
+        old_data = load_annotations(old_path)
+    else:
+        old_data = None
+
+    # replay edits of a session that did not save
+    journal_path = os.path.join(cmd_args.save_path, u_id + ".journal")
+    if os.path.exists(journal_path) and (old_data is None or os.path.getmtime(journal_path) > os.path.getmtime(old_path)):
+        journal_events = read_journal(journal_path)
+        print("Replaying {} unsaved edits from: {}".format(len(journal_events), journal_path))
+    else:
+        journal_events = None
+
+        # journal is already saved in the annotation
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+    # decode series once into memory mapped volume
+    if cmd_args.volume_cache:
+        volume = open_volume_cache(dicom_lst, get_volume_cache_path(cmd_args.save_path, input_path, u_id))
+    else:
+        volume = None
+
+    return {
+        "input_path": input_path,
+        "dicom_lst": dicom_lst,
+        "save_path": save_path,
+        "old_data": old_data,
+        "journal_path": journal_path,
+        "journal_events": journal_events,
+        "volume": volume,
+    }
+
+def annotate_study(study, cmd_args):
+    """
+    INPUTS:
+        study:
+            dict from prepare_study
+        cmd_args:
+            parsed command line args
+    OUTPUT:
+        future of the annotation save
+    """
+    # waits for the import started by main if it is still running
+    from src.renderDicom import plotDicom
+
+    # plot and get data
+    if cmd_args.cache_mb is not None:
+        cache_budget = int(cmd_args.cache_mb * 2**20)
+    else:
+        cache_budget = None
+
+    # time viewer events if requested
+    if cmd_args.profile:
+        profiler = EventProfiler()
+    else:
+        profiler = None
+
+    journal = AnnotationJournal(study["journal_path"])
+    rslt_data = plotDicom(study["dicom_lst"], cmd_args.settings_path, study["old_data"], study["volume"],
+        cache_budget, cmd_args.prefetch, journal, study["journal_events"], profiler)
+    journal.close()
+
+    # write latency summary next to the annotation
+    if profiler is not None:
+        profiler.save_summary(os.path.splitext(study["save_path"])[0] + ".profile.yaml")
+
+    # edits are in the annotation once saved
+    def remove_journal(future):
+        if future.exception() is None:
+            os.remove(study["journal_path"])
+
+    # save through a temporary file without blocking the next study
+    save_future = save_annotations_async(study["save_path"], rslt_data)
+    save_future.add_done_callback(remove_journal)
+
+    return save_future
+
 # main
 def main():
     # pass command line args
     cmd_parse = argparse.ArgumentParser(description = 'Application for scoring dicom files')
     cmd_parse.add_argument('-s', '--settings_path', help = 'path for settings file', type=str)
     cmd_parse.add_argument('-p', '--path', help = 'path for input dicom files', type=str)
+    cmd_parse.add_argument('-l', '--worklist', help = 'directory of studies or file of study paths to annotate in turn', type=str)
     cmd_parse.add_argument('-v', '--save_path', help = 'save path for data', type=str)
+    cmd_parse.add_argument('-w', '--workers', help = 'number of threads for reading dicom files', type=int)
+    cmd_parse.add_argument('-z', '--lazy', help = 'read headers only and decode images when viewed', action='store_true')
+    cmd_parse.add_argument('-i', '--index', help = 'cache series headers in an index next to the save path', action='store_true')
+    cmd_parse.add_argument('-c', '--volume_cache', help = 'cache decoded images in a memory mapped file next to the save path', action='store_true')
+    cmd_parse.add_argument('-m', '--cache_mb', help = 'memory budget in MB for decoded images kept while viewing', type=float)
+    cmd_parse.add_argument('-f', '--prefetch', help = 'number of neighboring slices and cine frames to decode ahead; requires -m', type=int, default=0)
+    cmd_parse.add_argument('-e', '--format', help = 'annotation file format', choices=list(FORMAT_EXTENSIONS), default='hdf5')
+    cmd_parse.add_argument('--profile', help = 'write per event latency summary next to the annotation', action='store_true')
     cmd_args = cmd_parse.parse_args()
 
     # check command line args
     if cmd_args.settings_path is None:
         raise AssertionError("No settings path specified")
-    elif not os.path.exists(cmd_args.path):
-        raise AssertionError("Cannot locate settings: " + cmd_args.path)
+    elif not os.path.exists(cmd_args.settings_path):
+        raise AssertionError("Cannot locate settings: " + cmd_args.settings_path)
+
+    # images are only decoded ahead into the slice cache
+    if cmd_args.prefetch and cmd_args.cache_mb is None:
+        raise AssertionError("Prefetch requires a memory budget (-m)")
 
-    # either requires path and user or meta data
-    if cmd_args.path is not None:
+    # either requires worklist, path and user or meta data
+    if cmd_args.worklist is not None:
+        # make sure path is valid
+        if not os.path.exists(cmd_args.worklist):
+            raise AssertionError("Cannot locate worklist: " + cmd_args.worklist)
+
+        # load studies
+        study_lst = read_worklist(cmd_args.worklist)
+
+    elif cmd_args.path is not None:
         # make sure path is valid
         if not os.path.exists(cmd_args.path):
             raise AssertionError("Cannot locate path: " + cmd_args.path)
 
         # load parameters
-        input_path = cmd_args.path
+        study_lst = [cmd_args.path]
 
     # have preivous metadata and data
     elif cmd_args.meta is not None:
@@ -56,35 +206,48 @@ def main():
             raise IOError("Problem loading: " + str(cmd_args.meta))
 
         # load from meta data
-        input_path = data['input_path']
+        study_lst = [data['input_path']]
 
-    # import dicom
-    dicom_lst = import_dicom(input_path)
+    if not study_lst:
+        print("No studies to annotate")
+        return
 
-    # get a unique id
-    if dicom_lst[0].AccessionNumber:
-        p = Path(cmd_args.path)
-        u_id = "{}_{}".format(dicom_lst[0].AccessionNumber, p.name)
-    else:
-        p = Path(cmd_args.path)
-        u_id = p.name
+    # ingest the next study while the current one is annotated
+    executor = ThreadPoolExecutor(max_workers=1)
+    next_study = executor.submit(prepare_study, study_lst[0], cmd_args)
 
-    # make annotation out path
-    save_path = os.path.join(cmd_args.save_path, u_id + ".hd")
+    # load matplotlib and the viewer while the first study is ingested
+    threading.Thread(target=importlib.import_module, args=("src.renderDicom",), daemon=True).start()
 
-    # test to see if old annotation exists
-    if os.path.exists(save_path):
-        old_data_path = save_path
-    else:
-        old_data_path = None
+    save_future_lst = []
+    for i in range(len(study_lst)):
+        # a study that fails is skipped so the rest of the worklist is kept
+        try:
+            study = next_study.result()
+        except Exception as e:
+            study = None
+            print("Skipping study {}: {}".format(study_lst[i], e), file=sys.stderr)
 
-    # plot and get data
-    rslt_data = plotDicom(dicom_lst, cmd_args.settings_path, old_data_path)
+        if i + 1 < len(study_lst):
+            next_study = executor.submit(prepare_study, study_lst[i + 1], cmd_args)
+
+        if study is None:
+            continue
+
+        if len(study_lst) > 1:
+            print("\nStudy {} of {}: {}".format(i + 1, len(study_lst), study["input_path"]))
+
+        try:
+            save_future_lst.append((study["save_path"], annotate_study(study, cmd_args)))
+        except Exception as e:
+            print("Skipping study {}: {}".format(study_lst[i], e), file=sys.stderr)
+
+    executor.shutdown()
 
-    # supress warnings
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        dd.io.save(save_path, rslt_data)
+    # wait for saves to finish
+    for save_path, save_future in save_future_lst:
+        if save_future.exception() is not None:
+            print("Failed to save {}: {}".format(save_path, save_future.exception()), file=sys.stderr)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import sys
+import argparse
+
+from glob import glob
+
+# import user defined functions
+from src.batch_scoring import find_study_path, score_studies
+from src.annotation_io import find_annotations, FORMAT_EXTENSIONS
+
+# main
+def main():
+    # pass command line args
+    cmd_parse = argparse.ArgumentParser(description = 'Batch calcium scoring of saved annotations')
+    cmd_parse.add_argument('-a', '--annotation_path', help = 'directory of saved annotations', type=str)
+    cmd_parse.add_argument('-d', '--dicom_path', help = 'directory of study dicom directories', type=str)
+    cmd_parse.add_argument('-o', '--out', help = 'results csv; existing studies are skipped', type=str)
+    cmd_parse.add_argument('-w', '--workers', help = 'number of processes', type=int)
+    cmd_parse.add_argument('--scoring', help = 'agatston scoring per slice or per lesion', choices=['slice', 'lesion'], default='slice')
+    cmd_args = cmd_parse.parse_args()
+
+    # check command line args
+    if cmd_args.annotation_path is None or not os.path.exists(cmd_args.annotation_path):
+        raise AssertionError("Cannot locate annotation path: " + str(cmd_args.annotation_path))
+    elif cmd_args.dicom_path is None or not os.path.exists(cmd_args.dicom_path):
+        raise AssertionError("Cannot locate dicom path: " + str(cmd_args.dicom_path))
+    elif cmd_args.out is None:
+        raise AssertionError("No output csv specified")
+
+    # match annotations to studies; the newest format of each annotation
+    annotation_set = set()
+    for ext in FORMAT_EXTENSIONS.values():
+        for annotation_path in glob(os.path.join(cmd_args.annotation_path, "*" + ext)):
+            annotation_set.add(find_annotations(annotation_path))
+
+    job_lst = []
+    for annotation_path in sorted(annotation_set):
+        study_path = find_study_path(annotation_path, cmd_args.dicom_path)
+        if study_path is None:
+            sys.stderr.write("No study found for: {}\n".format(annotation_path))
+        else:
+            job_lst.append((annotation_path, study_path))
+
+    # score
+    score_studies(job_lst, cmd_args.out, cmd_args.workers, cmd_args.scoring)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import json
+import warnings
+import threading
+
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+# file extension of each format
+FORMAT_EXTENSIONS = {
+    "hdf5": ".hd",
+    "npz": ".npz",
+}
+
+# blosc compression for hdf5
+HDF5_COMPRESSION = ("blosc", 5)
+
+# single writer so saves finish in order
+SAVE_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+# pytables is not thread safe; every hdf5 read and write holds this lock
+HDF5_LOCK = threading.Lock()
+
+def get_format(save_path):
+    """
+    INPUT:
+        save_path:
+            path of the annotation file
+    OUTPUT:
+        the format for the file extension; hdf5 if unknown
+    """
+    ext = os.path.splitext(save_path)[1]
+    for fmt, fmt_ext in FORMAT_EXTENSIONS.items():
+        if ext == fmt_ext:
+            return fmt
+
+    return "hdf5"
+
+def _to_builtin(value):
+    """
+    OUTPUT:
+        value with numpy scalars and tuples as python types
+    """
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(x) for x in value]
+    elif isinstance(value, np.generic):
+        return value.item()
+    else:
+        return value
+
+def encode_annotations(data_dict):
+    """
+    INPUT:
+        data_dict:
+            annotations in the .hd format
+    OUTPUT:
+        a copy with roi vertices as float arrays instead of Path objects
+    """
+    from matplotlib import path
+
+    vert_data = {}
+    for key, verts in data_dict["vert_data"].items():
+        if verts is None:
+            vert_data[key] = None
+        elif isinstance(verts, path.Path):
+            vert_data[key] = np.array(verts.vertices, dtype=float)
+        else:
+            vert_data[key] = np.array(verts, dtype=float)
+
+    return {
+        "slice_location": dict(data_dict["slice_location"]),
+        "point_locations": dict(data_dict["point_locations"]),
+        "vert_data": vert_data,
+        "roi_bounds": dict(data_dict["roi_bounds"]),
+    }
+
+def decode_annotations(data_dict):
+    """
+    INPUT:
+        data_dict:
+            annotations as saved
+    OUTPUT:
+        annotations with roi vertices as Path objects
+    """
+    from matplotlib import path
+
+    for key, verts in data_dict["vert_data"].items():
+        if verts is not None and not isinstance(verts, path.Path):
+            data_dict["vert_data"][key] = path.Path(np.asarray(verts, dtype=float))
+
+    return data_dict
+
+def _save_hdf5(save_path, data_dict):
+    """
+    EFFECT:
+        writes annotations with deepdish
+    """
+    import deepdish as dd
+
+    # supress warnings
+    with HDF5_LOCK, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        dd.io.save(save_path, data_dict, compression=HDF5_COMPRESSION)
+
+def _load_hdf5(save_path):
+    """
+    OUTPUT:
+        annotations read with deepdish
+    """
+    import deepdish as dd
+
+    with HDF5_LOCK, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return dd.io.load(save_path)
+
+def _save_npz(save_path, data_dict):
+    """
+    EFFECT:
+        writes roi vertices as arrays and everything else as json
+    """
+    meta = {
+        "slice_location": {k: _to_builtin(v) for k, v in data_dict["slice_location"].items()},
+        "point_locations": {k: _to_builtin(v) for k, v in data_dict["point_locations"].items()},
+        "roi_bounds": {k: _to_builtin(v) for k, v in data_dict["roi_bounds"].items()},
+        "vert_keys": list(data_dict["vert_data"]),
+    }
+
+    vert_dict = {}
+    for i, key in enumerate(meta["vert_keys"]):
+        if data_dict["vert_data"][key] is not None:
+            vert_dict["vert_{}".format(i)] = data_dict["vert_data"][key]
+
+    # file object so numpy does not change the extension
+    with open(save_path, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **vert_dict)
+
+def _load_npz(save_path):
+    """
+    OUTPUT:
+        annotations read from a .npz file
+    """
+    with np.load(save_path) as npz:
+        meta = json.loads(str(npz["meta"]))
+
+        vert_data = {}
+        for i, key in enumerate(meta["vert_keys"]):
+            name = "vert_{}".format(i)
+            vert_data[key] = npz[name] if name in npz.files else None
+
+    # points are tuples in the session
+    point_locations = {}
+    for key, loc in meta["point_locations"].items():
+        point_locations[key] = None if loc is None else tuple(loc)
+
+    return {
+        "slice_location": meta["slice_location"],
+        "point_locations": point_locations,
+        "vert_data": vert_data,
+        "roi_bounds": meta["roi_bounds"],
+    }
+
+SAVE_FUNCTIONS = {
+    "hdf5": _save_hdf5,
+    "npz": _save_npz,
+}
+
+LOAD_FUNCTIONS = {
+    "hdf5": _load_hdf5,
+    "npz": _load_npz,
+}
+
+def save_annotations(save_path, data_dict, fmt=None):
+    """
+    INPUTS:
+        save_path:
+            path of the annotation file
+        data_dict:
+            annotations in the .hd format
+        fmt:
+            hdf5 or npz; if None, determined from the extension
+    EFFECT:
+        writes through a temporary file so save_path is never partial
+    """
+    fmt = fmt or get_format(save_path)
+    data_dict = encode_annotations(data_dict)
+
+    tmp_path = save_path + ".tmp"
+    try:
+        SAVE_FUNCTIONS[fmt](tmp_path, data_dict)
+
+        # contents must be on disk before the rename, or a crash can leave
+        # save_path pointing at a partial file
+        with open(tmp_path, "r+b") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, save_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    # the rename itself must be on disk before the journal is removed
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(save_path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def save_annotations_async(save_path, data_dict, fmt=None):
+    """
+    INPUTS:
+        same as save_annotations
+    OUTPUT:
+        future of the save; data_dict is copied before returning so it may
+        be changed afterwards
+    """
+    fmt = fmt or get_format(save_path)
+    data_dict = encode_annotations(data_dict)
+
+    return SAVE_EXECUTOR.submit(save_annotations, save_path, data_dict, fmt)
+
+def find_annotations(save_path):
+    """
+    INPUT:
+        save_path:
+            path of the annotation file in the chosen format
+    OUTPUT:
+        the most recently saved annotation of the same name in any format;
+        None if there is none
+    """
+    stem = os.path.splitext(save_path)[0]
+    path_lst = [stem + ext for ext in FORMAT_EXTENSIONS.values() if os.path.exists(stem + ext)]
+
+    if not path_lst:
+        return None
+
+    return max(path_lst, key=os.path.getmtime)
+
+def load_annotations(save_path, fmt=None):
+    """
+    INPUTS:
+        save_path:
+            path of the annotation file
+        fmt:
+            hdf5 or npz; if None, determined from the extension
+    OUTPUT:
+        annotations in the .hd format with roi vertices as Path objects
+    """
+    fmt = fmt or get_format(save_path)
+
+    return decode_annotations(LOAD_FUNCTIONS[fmt](save_path))
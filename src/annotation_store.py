@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+# import libraries
+from itertools import product
+
+class AnnotationStore:
+    """
+    landmark and roi annotations indexed by (slice, cine frame) and landmark
+
+    data is kept in the flat dicts of the saved .hd format:
+        slice_location, point_locations, vert_data, roi_bounds
+    """
+    def __init__(self, data_dict, cine_series=None):
+        # store inputs
+        self.data_dict = data_dict
+        self.cine_series = cine_series
+
+        # flat dicts as saved
+        self.slice_location = data_dict["slice_location"]
+        self.point_locations = data_dict["point_locations"]
+        self.vert_data = data_dict["vert_data"]
+        self.roi_bounds = data_dict["roi_bounds"]
+
+        # key -> (landmark, cine frame) and landmark -> {cine frame: key}
+        self.key_info = {}
+        self.landmark_keys = {}
+        for key in self.point_locations:
+            landmark, cine_frame = self._parse_key(key)
+            self.key_info[key] = (landmark, cine_frame)
+            self.landmark_keys.setdefault(landmark, {})[cine_frame] = key
+
+        # (slice, cine frame) -> set of point keys
+        self.frame_keys = {}
+        for key in self.point_locations:
+            self._add_to_frame(key)
+
+    @classmethod
+    def from_landmarks(cls, point_lst, roi_lst, cine_series=None):
+        """
+        INPUTS:
+            point_lst:
+                list of point landmarks
+            roi_lst:
+                list of roi landmarks
+            cine_series:
+                number of cine frames; None if not a cine series
+        OUTPUT:
+            an empty annotation store
+        """
+        if cine_series:
+            cine_point_lst = ["{}_{}".format(x, y) for x, y in product(*[point_lst, range(cine_series)])]
+        else:
+            cine_point_lst = [x for x in point_lst]
+
+        data_dict = {
+            # all
+            "slice_location": dict(zip(cine_point_lst+roi_lst, [None for x in cine_point_lst+roi_lst])),
+            # point
+            "point_locations": dict(zip(cine_point_lst, [None for x in cine_point_lst])),
+            # roi
+            "vert_data": dict(zip(roi_lst, [None for x in roi_lst])),
+            "roi_bounds": dict(zip(roi_lst, [None for x in roi_lst])),
+        }
+
+        return cls(data_dict, cine_series)
+
+    def to_dict(self):
+        """
+        OUTPUT:
+            the annotations in the saved .hd format
+        """
+        return self.data_dict
+
+    def get_key(self, landmark, cine_frame):
+        """
+        OUTPUT:
+            the point key for landmark at cine frame
+        """
+        if self.cine_series:
+            return "{}_{}".format(landmark, cine_frame)
+        else:
+            return landmark
+
+    def frame(self, slice, cine_frame):
+        """
+        OUTPUT:
+            the frame index key for slice and cine frame
+        """
+        return (slice, cine_frame if self.cine_series else None)
+
+    def keys_at(self, slice, cine_frame):
+        """
+        OUTPUT:
+            set of point keys located on slice and cine frame
+        """
+        return self.frame_keys.get(self.frame(slice, cine_frame), set())
+
+    def set_point(self, key, loc, slice):
+        """
+        EFFECT:
+            marks point key at loc on slice
+        """
+        self.point_locations[key] = loc
+        self.set_slice(key, slice)
+
+    def clear_point(self, key):
+        """
+        EFFECT:
+            removes marked point key
+        """
+        self.point_locations[key] = None
+        self.set_slice(key, None)
+
+    def set_slice(self, key, slice):
+        """
+        EFFECT:
+            moves key to slice and updates the frame index
+        """
+        self._remove_from_frame(key)
+        self.slice_location[key] = slice
+        self._add_to_frame(key)
+
+    def set_roi(self, key, verts, slice, bounds):
+        """
+        EFFECT:
+            sets roi key; rois are not indexed by frame
+        """
+        self.vert_data[key] = verts
+        self.slice_location[key] = slice
+        self.roi_bounds[key] = bounds
+
+    def clear_roi(self, key):
+        """
+        EFFECT:
+            removes roi key
+        """
+        self.set_roi(key, None, None, None)
+
+    def _parse_key(self, key):
+        """
+        OUTPUT:
+            landmark and cine frame of point key
+        """
+        if self.cine_series:
+            landmark, cine_frame = key.rsplit("_", 1)
+            return landmark, int(cine_frame)
+        else:
+            return key, None
+
+    def _add_to_frame(self, key):
+        slice = self.slice_location.get(key)
+        if slice is not None and key in self.key_info:
+            frame = (slice, self.key_info[key][1])
+            self.frame_keys.setdefault(frame, set()).add(key)
+
+    def _remove_from_frame(self, key):
+        slice = self.slice_location.get(key)
+        if slice is not None and key in self.key_info:
+            frame = (slice, self.key_info[key][1])
+            self.frame_keys.get(frame, set()).discard(key)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import csv
+import sys
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# import user defined functions
+from src.utility import import_dicom
+from src.annotation_io import load_annotations
+from src.process_roi import get_roi_mask
+from src.process_calcium import get_calcium_measurements
+
+CSV_COLUMNS = ["annotation", "study", "roi", "score", "volume"]
+
+def find_study_path(annotation_path, dicom_dir):
+    """
+    INPUTS:
+        annotation_path:
+            path to a saved annotation
+        dicom_dir:
+            directory holding one directory per study
+    OUTPUT:
+        the study directory the annotation was made on; None if not found
+    """
+    # annotations are saved as <AccessionNumber>_<study> or <study>
+    stem = Path(annotation_path).stem
+    candidate_lst = [stem]
+    if "_" in stem:
+        candidate_lst.append(stem.split("_", 1)[1])
+
+    for candidate in candidate_lst:
+        study_path = os.path.join(dicom_dir, candidate)
+        if os.path.isdir(study_path):
+            return study_path
+
+    return None
+
+def get_roi_masks(data_dict, dicom_dims, n_slices):
+    """
+    INPUTS:
+        data_dict:
+            the saved annotation dict
+        dicom_dims:
+            the XY shape of the images
+        n_slices:
+            the number of images in the series
+    OUTPUT:
+        list of (roi key, RoiMask) for every drawn roi
+    """
+    roi_lst = []
+    for key, verts in data_dict["vert_data"].items():
+        if verts is None:
+            continue
+
+        # roi covers its bounds around the slice it was drawn on
+        center = int(data_dict["slice_location"][key])
+        bounds = int(data_dict["roi_bounds"][key] or 0)
+        slice_range = (max(center - bounds, 0), min(center + bounds + 1, n_slices))
+
+        roi_lst.append((key, get_roi_mask(verts, dicom_dims, slice_range)))
+
+    return roi_lst
+
+def score_study(annotation_path, study_path, scoring="slice"):
+    """
+    INPUTS:
+        annotation_path:
+            path to a saved annotation
+        study_path:
+            path to the study dicom files
+        scoring:
+            slice or lesion agatston scoring
+    OUTPUT:
+        list of csv rows, one per roi; a single empty row if there are none
+    """
+    # load annotation
+    data_dict = load_annotations(annotation_path)
+
+    # headers only; pixels are decoded for roi slices
+    dicom_lst = import_dicom(study_path, lazy=True)
+    dicom_dims = (int(dicom_lst[0].Columns), int(dicom_lst[0].Rows))
+
+    row_lst = []
+    for key, roi_mask in get_roi_masks(data_dict, dicom_dims, len(dicom_lst)):
+        if roi_mask.mask.any():
+            ca_score, ca_vol = get_calcium_measurements(roi_mask, dicom_lst, scoring=scoring)
+        else:
+            ca_score, ca_vol = 0., 0.
+
+        row_lst.append([annotation_path, study_path, key, float(ca_score), float(ca_vol)])
+
+    # record study as scored
+    if not row_lst:
+        row_lst.append([annotation_path, study_path, "", "", ""])
+
+    return row_lst
+
+def read_scored_annotations(csv_path):
+    """
+    INPUTS:
+        csv_path:
+            path to the results csv
+    OUTPUT:
+        set of annotation paths already in the csv
+    """
+    if not os.path.exists(csv_path):
+        return set()
+
+    with open(csv_path, "r", newline="") as f:
+        return set(x["annotation"] for x in csv.DictReader(f))
+
+def score_studies(job_lst, csv_path, workers=None, scoring="slice"):
+    """
+    INPUTS:
+        job_lst:
+            list of (annotation path, study path)
+        csv_path:
+            path to the results csv; appended to
+        workers:
+            number of processes; if None, uses the number of cpus
+        scoring:
+            slice or lesion agatston scoring
+    EFFECT:
+        scores studies in parallel and writes each study's rows as soon as
+        it finishes; studies already in the csv are skipped
+    """
+    # skip scored studies
+    scored_set = read_scored_annotations(csv_path)
+    job_lst = [x for x in job_lst if x[0] not in scored_set]
+
+    new_file = not os.path.exists(csv_path)
+    with open(csv_path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(CSV_COLUMNS)
+            f.flush()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            future_dict = {executor.submit(score_study, a, s, scoring): a for a, s in job_lst}
+
+            for i, future in enumerate(as_completed(future_dict)):
+                annotation_path = future_dict[future]
+
+                # failed studies are left out so a rerun retries them
+                try:
+                    row_lst = future.result()
+                except Exception as e:
+                    sys.stderr.write("\nProblem scoring {}: {}".format(annotation_path, e))
+                    continue
+
+                writer.writerows(row_lst)
+                f.flush()
+
+                sys.stdout.write("\rScored {} of {}".format(i + 1, len(job_lst)))
+                sys.stdout.flush()
+
+    sys.stdout.write("\n")
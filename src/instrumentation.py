@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+
+# import libraries
+import time
+import contextlib
+
+import numpy as np
+
+from collections import deque
+
+# number of recent samples kept per event and section
+DEFAULT_WINDOW = 2000
+
+# reported percentiles
+PERCENTILES = [50, 90, 99]
+
+# upper edges in ms of the latency histogram bins
+HISTOGRAM_BINS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+class NullProfiler:
+    """
+    profiler that records nothing; used when instrumentation is disabled
+    """
+    enabled = False
+
+    def __init__(self):
+        self.null_context = contextlib.nullcontext()
+
+    def event(self, name):
+        return self.null_context
+
+    def section(self, name):
+        return self.null_context
+
+class EventProfiler:
+    """
+    records the latency of viewer events and of the fetch, interpolation
+    and draw sections within them over a rolling window
+    """
+    enabled = True
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        # store inputs
+        self.window = window
+
+        # event -> samples of total time, and (event, section) -> samples
+        self.event_times = {}
+        self.section_times = {}
+        self.event_counts = {}
+
+        # currently timed event
+        self.curr_event = None
+        self.curr_sections = {}
+
+    @contextlib.contextmanager
+    def event(self, name):
+        """
+        INPUT:
+            name:
+                the event name
+        EFFECT:
+            times the enclosed event; events started within another event
+            are counted as part of it
+        """
+        if self.curr_event is not None:
+            yield
+            return
+
+        self.curr_event = name
+        self.curr_sections = {}
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+
+            self._add_sample(self.event_times, name, elapsed)
+            self.event_counts[name] = self.event_counts.get(name, 0) + 1
+            for section, section_time in self.curr_sections.items():
+                self._add_sample(self.section_times, (name, section), section_time)
+
+            self.curr_event = None
+
+    @contextlib.contextmanager
+    def section(self, name):
+        """
+        INPUT:
+            name:
+                fetch, interpolation or draw
+        EFFECT:
+            adds the time of the enclosed code to the current event
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.curr_event is not None:
+                self.curr_sections[name] = self.curr_sections.get(name, 0) + time.perf_counter() - start
+
+    def wrap(self, name, func):
+        """
+        INPUTS:
+            name:
+                the event name
+            func:
+                the event handler
+        OUTPUT:
+            handler timed as event name
+        """
+        def timed_func(*args, **kwargs):
+            with self.event(name):
+                return func(*args, **kwargs)
+
+        return timed_func
+
+    def summary(self):
+        """
+        OUTPUT:
+            dict of event to count, latency percentiles and histogram in ms,
+            with the same for each section
+        """
+        summary_dict = {}
+        for name, sample_dq in self.event_times.items():
+            summary_dict[name] = get_latency_summary(sample_dq)
+            summary_dict[name]["count"] = self.event_counts[name]
+
+            summary_dict[name]["sections"] = {}
+            for (event, section), section_dq in self.section_times.items():
+                if event == name:
+                    summary_dict[name]["sections"][section] = get_latency_summary(section_dq)
+
+        return summary_dict
+
+    def save_summary(self, summary_path):
+        """
+        INPUT:
+            summary_path:
+                path of the yaml summary
+        EFFECT:
+            writes the session summary
+        """
+        import yaml
+
+        with open(summary_path, "w") as f:
+            yaml.safe_dump(self.summary(), f, default_flow_style=False, sort_keys=False)
+
+    def _add_sample(self, sample_dict, key, elapsed):
+        """
+        EFFECT:
+            appends elapsed seconds to the rolling samples of key
+        """
+        if key not in sample_dict:
+            sample_dict[key] = deque(maxlen=self.window)
+
+        sample_dict[key].append(elapsed)
+
+def get_latency_summary(sample_dq):
+    """
+    INPUT:
+        sample_dq:
+            latency samples in seconds
+    OUTPUT:
+        dict of percentiles, mean and max in ms and histogram bin counts
+    """
+    ms_ary = np.asarray(sample_dq) * 1000
+
+    summary_dict = {"samples": len(ms_ary)}
+    for q, value in zip(PERCENTILES, np.percentile(ms_ary, PERCENTILES)):
+        summary_dict["p{}_ms".format(q)] = round(float(value), 3)
+    summary_dict["mean_ms"] = round(float(ms_ary.mean()), 3)
+    summary_dict["max_ms"] = round(float(ms_ary.max()), 3)
+
+    # counts up to each bin edge; the last bin is everything slower
+    counts = np.histogram(ms_ary, [0] + HISTOGRAM_BINS_MS + [np.inf])[0]
+    labels = ["<{}ms".format(x) for x in HISTOGRAM_BINS_MS] + [">={}ms".format(HISTOGRAM_BINS_MS[-1])]
+    summary_dict["histogram"] = dict(zip(labels, [int(x) for x in counts]))
+
+    return summary_dict
@@ -1,8 +1,9 @@
 # import libraries
+import bisect
+
 import numpy as np
 
 from math import floor, ceil
-from scipy.interpolate import splev, splrep
 
 def get_1d_interpolation(x, y, t_max, times = 6, type = "linear"):
     """
@@ -14,7 +15,9 @@ def get_1d_interpolation(x, y, t_max, times = 6, type = "linear"):
         t_max:
             range of time points to get (cine frames)
         times:
-            number of periodic time frames to use for interpolation
+            number of periodic time frames to use for linear interpolation
+        type:
+            linear or periodic (cubic spline)
     OUTPUT:
         perioidc inteprolation; defaults to single value if nothing
     """
@@ -22,6 +25,11 @@ def get_1d_interpolation(x, y, t_max, times = 6, type = "linear"):
         unique_val = y[0]
         return np.array([unique_val] * t_max)
 
+    # closed form periodic spline; no tiling needed
+    if type == "periodic":
+        indx = np.argsort(x)
+        return periodic_spline_interpolate(np.asarray(x)[indx], np.asarray(y, dtype=float)[indx][None], t_max)[0]
+
     # potential to riase Warning
     if times < 1:
         raise AssertionError("Must have at least one interpolation period")
@@ -41,18 +49,13 @@ def get_1d_interpolation(x, y, t_max, times = 6, type = "linear"):
 
     if type == "linear":
         interp_y = np.interp(interp_x, x_conc, y_conc)
-
-    elif type == "periodic":
-        # create interpolation object and interpolate
-        spl = splrep(x_conc, y_conc)
-        interp_y = splev(interp_x, spl)
     else:
         raise AssertionError("Type must be either linear or periodic. Got {}".format(type))
 
 
     return interp_y
 
-def cine_interpolate(ijk_coord_arry, t_arry, t_max = 20):
+def cine_interpolate(ijk_coord_arry, t_arry, t_max = 20, type = "linear"):
     """
     INPUTS:
         ijk_coord_arry:
@@ -62,6 +65,8 @@ def cine_interpolate(ijk_coord_arry, t_arry, t_max = 20):
             time point array
         t_max:
             range of time points to get (cine frames)
+        type:
+            linear or periodic (cubic spline)
     OUTPUT:
         [0] interp_coords:
             idj cooridnates that have been interpolated for cine frames
@@ -70,14 +75,14 @@ def cine_interpolate(ijk_coord_arry, t_arry, t_max = 20):
     """
 
     # get interpolation
-    interp_coords = [get_1d_interpolation(t_arry, x, t_max) for x in ijk_coord_arry.T]
+    interp_coords = [get_1d_interpolation(t_arry, x, t_max, type=type) for x in ijk_coord_arry.T]
 
     # get time values
     interp_x = np.arange(0, t_max)
 
     return interp_coords, interp_x
 
-def linear_interpolate_slices(slice_arry, t_arry, t_max = 20, times = 6):
+def linear_interpolate_slices(slice_arry, t_arry, t_max = 20, times = 6, type = "linear"):
     """
     INPUTS:
         slice_arry:
@@ -86,12 +91,19 @@ def linear_interpolate_slices(slice_arry, t_arry, t_max = 20, times = 6):
             time point array
         t_max:
             range of time points to get (cine frames)
+        type:
+            linear or periodic (cubic spline)
     OUTPUT:
         [0] interp_coords:
             slice cooridnates that have been interpolated for cine frames
         [1] interp_x:
             matching cine frames
     """
+    # closed form periodic spline
+    if type == "periodic":
+        interp_x = np.arange(0, t_max)
+        interp_y = np.round(get_1d_interpolation(t_arry, slice_arry, t_max, type=type))
+        return interp_y, interp_x
 
     # determine how many periods before and after
     pre_periods = ceil(times/2)
@@ -106,3 +118,351 @@ def linear_interpolate_slices(slice_arry, t_arry, t_max = 20, times = 6):
     interp_y = np.round(np.interp(interp_x, y_conc, x_conc))
 
     return interp_y, interp_x
+
+def periodic_spline_interpolate(x, y_ary, t_max):
+    """
+    INPUTS:
+        x:
+            sorted, unique known frames
+        y_ary:
+            numpy array of values at x
+            [trajectory, indx]
+        t_max:
+            number of frames in one period
+    OUTPUT:
+        periodic cubic spline through the known values at every frame
+        [trajectory, frame]
+    """
+    x = np.asarray(x, dtype=float)
+    y_ary = np.asarray(y_ary, dtype=float)
+    n = len(x)
+
+    # a single knot is constant
+    if n == 1:
+        return np.repeat(y_ary, t_max, axis=-1)
+
+    # knot spacing; the last segment wraps to the first knot
+    h = np.diff(np.append(x, x[0] + t_max))
+    h_prev = np.roll(h, 1)
+
+    # cyclic tridiagonal system for the second derivatives
+    indx = np.arange(n)
+    a_mtx = np.zeros([n, n])
+    a_mtx[indx, indx] = 2 * (h_prev + h)
+    a_mtx[indx, (indx - 1) % n] += h_prev
+    a_mtx[indx, (indx + 1) % n] += h
+
+    slope = (np.roll(y_ary, -1, axis=-1) - y_ary) / h
+    rhs = 6 * (slope - np.roll(slope, 1, axis=-1))
+
+    # solve all trajectories at once
+    m_ary = np.linalg.solve(a_mtx, rhs.T).T
+
+    # find segment of every frame; frames before the first knot wrap
+    t = np.arange(t_max, dtype=float)
+    seg = np.searchsorted(x, t, side="right") - 1
+    t = np.where(seg < 0, t + t_max, t)
+    seg = seg % n
+    seg_next = (seg + 1) % n
+
+    # evaluate cubic on segment
+    h_seg = h[seg]
+    a = x[seg] + h_seg - t
+    b = t - x[seg]
+    m_0, m_1 = m_ary[:, seg], m_ary[:, seg_next]
+    y_0, y_1 = y_ary[:, seg], y_ary[:, seg_next]
+
+    return (
+        (m_0 * a**3 + m_1 * b**3) / (6 * h_seg) +
+        (y_0 - m_0 * h_seg**2 / 6) * a / h_seg +
+        (y_1 - m_1 * h_seg**2 / 6) * b / h_seg
+    )
+
+def get_periodic_neighbors(mask):
+    """
+    INPUT:
+        mask:
+            boolean array of known frames
+            [trajectory, frame]
+    OUTPUT:
+        [0] prev_ary:
+            previous known frame for each frame; below 0 if it wraps around
+        [1] next_ary:
+            next known frame for each frame; past the last frame if it wraps
+    """
+    t_max = mask.shape[-1]
+    frames = np.arange(t_max)
+
+    # nearest known frame at or before each frame; wrap to last known frame
+    prev_ary = np.maximum.accumulate(np.where(mask, frames, -1), axis=-1)
+    prev_ary = np.where(prev_ary < 0, prev_ary[:, -1:] - t_max, prev_ary)
+
+    # nearest known frame at or after each frame; wrap to first known frame
+    next_ary = np.minimum.accumulate(np.where(mask, frames, 2 * t_max)[:, ::-1], axis=-1)[:, ::-1]
+    next_ary = np.where(next_ary >= 2 * t_max, next_ary[:, :1] + t_max, next_ary)
+
+    return prev_ary, next_ary
+
+def batch_interpolate(value_ary, mask, type = "linear"):
+    """
+    INPUTS:
+        value_ary:
+            numpy array of values; ignored where mask is False
+            [trajectory, frame]
+        mask:
+            boolean array of known frames
+            [trajectory, frame]
+        type:
+            linear or periodic (cubic spline)
+    OUTPUT:
+        periodic interpolation of every trajectory over all frames; nan for
+        trajectories without known frames
+    """
+    value_ary = np.asarray(value_ary, dtype=float)
+    mask = np.asarray(mask, dtype=bool)
+    t_max = mask.shape[-1]
+
+    if type == "periodic":
+        return batch_periodic_spline(value_ary, mask)
+    elif type != "linear":
+        raise AssertionError("Type must be either linear or periodic. Got {}".format(type))
+
+    # get surrounding known frames, wrapping around the cycle
+    prev_ary, next_ary = get_periodic_neighbors(mask)
+    frames = np.arange(t_max)
+    span = next_ary - prev_ary
+    weight = np.divide(frames - prev_ary, span, out=np.zeros(span.shape), where=span > 0)
+
+    # linearly interpolate between known values
+    rows = np.arange(mask.shape[0])[:, None]
+    prev_val = value_ary[rows, prev_ary % t_max]
+    next_val = value_ary[rows, next_ary % t_max]
+    interp_ary = prev_val + weight * (next_val - prev_val)
+
+    # no known frames
+    interp_ary[~mask.any(axis=-1)] = np.nan
+
+    return interp_ary
+
+def batch_periodic_spline(value_ary, mask):
+    """
+    INPUTS:
+        value_ary:
+            numpy array of values; ignored where mask is False
+            [trajectory, frame]
+        mask:
+            boolean array of known frames
+            [trajectory, frame]
+    OUTPUT:
+        periodic cubic spline of every trajectory over all frames; nan for
+        trajectories without known frames
+    """
+    interp_ary = np.full(value_ary.shape, np.nan)
+
+    # trajectories with the same known frames share one solve
+    if (mask == mask[:1]).all():
+        pattern_ary, inverse = mask[:1], np.zeros(mask.shape[0], dtype=int)
+    else:
+        pattern_ary, inverse = np.unique(mask, axis=0, return_inverse=True)
+    for i, pattern in enumerate(pattern_ary):
+        if not pattern.any():
+            continue
+
+        rows = np.nonzero(inverse.reshape(-1) == i)[0]
+        x = np.nonzero(pattern)[0]
+        interp_ary[rows] = periodic_spline_interpolate(x, value_ary[rows][:, x], mask.shape[-1])
+
+    return interp_ary
+
+def batch_cine_interpolate(coord_ary, slice_ary, mask, type = "linear"):
+    """
+    INPUTS:
+        coord_ary:
+            numpy array of coordinates
+            [landmark, frame, axis]
+        slice_ary:
+            numpy array of slices
+            [landmark, frame]
+        mask:
+            boolean array of annotated frames
+            [landmark, frame]
+        type:
+            linear or periodic (cubic spline)
+    OUTPUT:
+        [0] interp_coords:
+            coordinates interpolated for all cine frames
+            [landmark, frame, axis]
+        [1] interp_slices:
+            slices interpolated for all cine frames
+            [landmark, frame]
+    """
+    n_landmark, t_max, n_axis = coord_ary.shape
+
+    # interpolate every axis of every landmark together
+    axis_ary = np.moveaxis(coord_ary, -1, 1).reshape(-1, t_max)
+    axis_mask = np.repeat(mask, n_axis, axis=0)
+    interp_coords = batch_interpolate(axis_ary, axis_mask, type)
+    interp_coords = np.moveaxis(interp_coords.reshape(n_landmark, n_axis, t_max), 1, -1)
+
+    # slices are interpolated the same way
+    interp_slices = np.round(batch_interpolate(slice_ary, mask, type))
+
+    return interp_coords, interp_slices
+
+class CineTrajectory:
+    """
+    interpolated cine trajectory of a single landmark, updated incrementally
+    as control points are set and removed
+    """
+    def __init__(self, t_max, type = "linear"):
+        # store inputs
+        self.t_max = t_max
+        self.type = type
+
+        # control points and interpolated values for every frame
+        self.frames = []
+        self.mask = np.zeros(t_max, dtype=bool)
+        self.coords = np.full([t_max, 2], np.nan)
+        self.slices = np.full(t_max, np.nan)
+
+        # raw control slices; interpolated slices are rounded
+        self.control_slices = np.full(t_max, np.nan)
+
+    @classmethod
+    def from_batch(cls, coord_ary, slice_ary, mask, type = "linear"):
+        """
+        INPUTS:
+            coord_ary:
+                numpy array of coordinates
+                [landmark, frame, axis]
+            slice_ary:
+                numpy array of slices
+                [landmark, frame]
+            mask:
+                boolean array of annotated frames
+                [landmark, frame]
+        OUTPUT:
+            list of trajectories, interpolated together in one pass
+        """
+        interp_coords, interp_slices = batch_cine_interpolate(coord_ary, slice_ary, mask, type)
+
+        traj_lst = []
+        for i in range(mask.shape[0]):
+            traj = cls(mask.shape[-1], type)
+            traj.frames = np.nonzero(mask[i])[0].tolist()
+            traj.mask = mask[i].copy()
+            traj.coords = interp_coords[i]
+            traj.slices = interp_slices[i]
+            traj.control_slices = np.where(mask[i], slice_ary[i], np.nan)
+
+            # control points keep their exact values
+            traj.coords[mask[i]] = coord_ary[i][mask[i]]
+            traj.slices[mask[i]] = slice_ary[i][mask[i]]
+            traj_lst.append(traj)
+
+        return traj_lst
+
+    def set_point(self, frame, loc, slice):
+        """
+        INPUTS:
+            frame:
+                cine frame of control point
+            loc:
+                xy coordinate
+            slice:
+                slice of control point
+        OUTPUT:
+            array of frames whose values changed
+        """
+        if frame not in self.frames:
+            bisect.insort(self.frames, frame)
+
+        self.mask[frame] = True
+        self.coords[frame] = loc
+        self.slices[frame] = slice
+        self.control_slices[frame] = slice
+
+        return self._update(frame)
+
+    def remove_point(self, frame):
+        """
+        INPUTS:
+            frame:
+                cine frame of control point
+        OUTPUT:
+            array of frames whose values changed
+        """
+        if frame not in self.frames:
+            return np.array([], dtype=int)
+
+        self.frames.remove(frame)
+        self.mask[frame] = False
+        self.control_slices[frame] = np.nan
+
+        return self._update(frame)
+
+    def _update(self, frame):
+        """
+        OUTPUT:
+            array of frames recomputed after a change at frame
+        """
+        all_frames = np.arange(self.t_max)
+
+        # no control points
+        if not self.frames:
+            self.coords[:] = np.nan
+            self.slices[:] = np.nan
+            return all_frames
+
+        # splines and single segments are refit as a whole
+        other_lst = [x for x in self.frames if x != frame]
+        if self.type != "linear" or len(set(other_lst)) < 2:
+            x = np.array(self.frames)
+            value_ary = np.concatenate([self.coords[x].T, self.control_slices[x][None]])
+
+            if self.type == "linear":
+                mask = np.tile(self.mask, (3, 1))
+                full_ary = np.zeros([3, self.t_max])
+                full_ary[:, x] = value_ary
+                interp_ary = batch_interpolate(full_ary, mask)
+            else:
+                interp_ary = periodic_spline_interpolate(x, value_ary, self.t_max)
+
+            self._assign(all_frames, interp_ary)
+            return all_frames
+
+        # linear; only the segments on either side of frame change
+        indx = bisect.bisect_left(other_lst, frame)
+        prev_frame = other_lst[indx - 1]
+        next_frame = other_lst[indx % len(other_lst)]
+
+        # unwrap around frame
+        if prev_frame > frame:
+            prev_frame = prev_frame - self.t_max
+        if next_frame < frame:
+            next_frame = next_frame + self.t_max
+
+        # interpolate between neighbors, through frame if it is a control point
+        knot_lst = [prev_frame, frame, next_frame] if self.mask[frame] else [prev_frame, next_frame]
+        knot_val = np.stack([
+            np.append(self.coords[x % self.t_max], self.control_slices[x % self.t_max]) for x in knot_lst
+        ], axis=-1)
+
+        seg_frames = np.arange(prev_frame + 1, next_frame)
+        interp_ary = np.stack([np.interp(seg_frames, knot_lst, x) for x in knot_val])
+
+        changed = seg_frames % self.t_max
+        keep = ~self.mask[changed]
+        self._assign(changed[keep], interp_ary[:, keep])
+
+        return changed
+
+    def _assign(self, frames, interp_ary):
+        """
+        EFFECT:
+            stores interpolated [x, y, slice] rows for non control frames
+        """
+        keep = ~self.mask[frames]
+        frames = frames[keep]
+        self.coords[frames] = interp_ary[:2, keep].T
+        self.slices[frames] = np.round(interp_ary[2, keep])
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import json
+import queue
+import threading
+
+import numpy as np
+
+class AnnotationJournal:
+    """
+    append only log of annotation edits made during a session
+
+    each edit is one json line; lines are written and synced to disk on a
+    background thread so recording an edit never waits on the disk
+    """
+    def __init__(self, journal_path):
+        # store inputs
+        self.journal_path = journal_path
+
+        # writer thread
+        self.queue = queue.Queue()
+        self.f = open(journal_path, "a")
+        self.writer = threading.Thread(target=self._write_events, daemon=True)
+        self.writer.start()
+
+    def record(self, event, key, **values):
+        """
+        INPUTS:
+            event:
+                point, clear_point, roi or clear_roi
+            key:
+                the annotation key edited
+            values:
+                json serializable values of the edit
+        EFFECT:
+            queues the edit to be appended to the journal
+        """
+        values["event"] = event
+        values["key"] = key
+        self.queue.put(values)
+
+    def close(self):
+        """
+        EFFECT:
+            writes all queued edits and closes the journal
+        """
+        self.queue.put(None)
+        self.writer.join()
+        self.f.close()
+
+    def _write_events(self):
+        """
+        EFFECT:
+            appends queued edits until closed
+        """
+        while True:
+            values = self.queue.get()
+            if values is None:
+                return
+
+            self.f.write(json.dumps(values) + "\n")
+
+            # sync only once the queue is drained
+            if self.queue.empty():
+                self.f.flush()
+                os.fsync(self.f.fileno())
+
+def read_journal(journal_path):
+    """
+    INPUT:
+        journal_path:
+            path to the journal
+    OUTPUT:
+        list of recorded edits in order; a partially written last line is
+        ignored
+    """
+    event_lst = []
+    with open(journal_path, "r") as f:
+        for line in f:
+            try:
+                event_lst.append(json.loads(line))
+            except ValueError:
+                break
+
+    return event_lst
+
+def replay_journal(annotations, event_lst):
+    """
+    INPUTS:
+        annotations:
+            AnnotationStore to apply the edits to
+        event_lst:
+            list of recorded edits
+    EFFECT:
+        applies the edits in order; edits of unknown keys are skipped
+    """
+    from matplotlib import path
+
+    for values in event_lst:
+        key = values["key"]
+        event = values["event"]
+
+        if event == "point" and key in annotations.point_locations:
+            annotations.set_point(key, tuple(values["loc"]), values["slice"])
+        elif event == "clear_point" and key in annotations.point_locations:
+            annotations.clear_point(key)
+        elif event == "roi" and key in annotations.vert_data:
+            verts = path.Path(np.array(values["verts"], dtype=float))
+            annotations.set_roi(key, verts, values["slice"], values["bounds"])
+        elif event == "clear_roi" and key in annotations.vert_data:
+            annotations.clear_roi(key)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+# import libraries
+import struct
+
+import numpy as np
+import pydicom as dicom
+
+from pydicom.uid import ImplicitVRLittleEndian, ExplicitVRLittleEndian
+
+# transfer syntaxes whose pixel data can be mapped straight from the file
+UNCOMPRESSED_SYNTAXES = [
+    ImplicitVRLittleEndian,
+    ExplicitVRLittleEndian,
+]
+
+PIXEL_DATA_TAG = (0x7FE0, 0x0010)
+UNDEFINED_LENGTH = 0xFFFFFFFF
+
+class LazyDicomSlice:
+    """
+    dicom header that decodes its pixel data on first access
+    """
+    def __init__(self, path, header=None, fields=None, pixel_layout=None):
+        # store inputs
+        self.path = path
+        self.header = header
+
+        # cached header values; names listed here but missing are absent tags
+        self.fields = fields
+
+        # (offset, dtype, shape) of uncompressed pixel data; None to decode
+        self.pixel_layout = pixel_layout
+
+        # pixels are only decoded when requested
+        self._pixel_array = None
+
+    def __getattr__(self, name):
+        # only called for attributes not on the object; defer to the header
+        if name in ("header", "fields"):
+            raise AttributeError(name)
+
+        # serve cached header values without touching the file
+        if self.fields is not None and name in self.fields:
+            if self.fields[name] is None:
+                raise AttributeError(name)
+            return self.fields[name]
+
+        return getattr(self._load_header(), name)
+
+    def __getitem__(self, tag):
+        return self._load_header()[tag]
+
+    def _load_header(self):
+        """
+        OUTPUT:
+            the header, read from file if not yet loaded
+        """
+        if self.header is None:
+            self.header = dicom.read_file(self.path, stop_before_pixels=True)
+
+        return self.header
+
+    @property
+    def pixel_array(self):
+        """
+        OUTPUT:
+            the decoded pixel array; decoded once and kept
+        """
+        if self._pixel_array is None:
+            self._pixel_array = self.load_pixel_array()
+
+        return self._pixel_array
+
+    def load_pixel_array(self):
+        """
+        OUTPUT:
+            freshly decoded pixel array; not kept on the object. uncompressed
+            images are read straight from their offset in the file, so no
+            file handle is kept open
+        """
+        if self.pixel_layout is not None:
+            offset, dtype, shape = self.pixel_layout
+            count = int(np.prod(shape))
+            return np.fromfile(self.path, dtype=np.dtype(dtype), count=count, offset=offset).reshape(shape)
+
+        return dicom.read_file(self.path).pixel_array
+
+def get_pixel_layout(header, pixel_tell, element_bytes):
+    """
+    INPUT:
+        header:
+            dicom header read up to the pixel data
+        pixel_tell:
+            file position of the pixel data element
+        element_bytes:
+            the first 12 bytes of the pixel data element
+    OUTPUT:
+        (offset, dtype, shape) of the pixel values in the file; None if the
+        pixel data cannot be mapped directly
+    """
+    # only uncompressed little endian syntaxes
+    file_meta = getattr(header, "file_meta", None)
+    if getattr(file_meta, "TransferSyntaxUID", None) not in UNCOMPRESSED_SYNTAXES:
+        return None
+
+    # only single frame grayscale images
+    if int(getattr(header, "SamplesPerPixel", 1)) != 1:
+        return None
+    elif int(getattr(header, "NumberOfFrames", 1) or 1) != 1:
+        return None
+
+    # determine dtype; signed values must fill every allocated bit
+    bits_allocated = int(header.BitsAllocated)
+    if bits_allocated not in (8, 16, 32):
+        return None
+    elif int(header.PixelRepresentation) and int(header.BitsStored) != bits_allocated:
+        return None
+
+    dtype = "<{}{}".format("i" if int(header.PixelRepresentation) else "u", bits_allocated // 8)
+    shape = [int(header.Rows), int(header.Columns)]
+
+    # parse element header
+    if len(element_bytes) < 12:
+        return None
+
+    group, element = struct.unpack("<HH", element_bytes[:4])
+    if (group, element) != PIXEL_DATA_TAG:
+        return None
+
+    if header.is_implicit_VR:
+        length = struct.unpack("<I", element_bytes[4:8])[0]
+        offset = pixel_tell + 8
+    else:
+        length = struct.unpack("<I", element_bytes[8:12])[0]
+        offset = pixel_tell + 12
+
+    # encapsulated or truncated data is decoded by pydicom
+    if length == UNDEFINED_LENGTH or length < shape[0] * shape[1] * bits_allocated // 8:
+        return None
+
+    return [offset, dtype, shape]
+
+def read_dicom_header(path):
+    """
+    INPUT:
+        path:
+            path to a dicom file
+    OUTPUT:
+        LazyDicomSlice with the header read up to the pixel data and the
+        location of uncompressed pixel data recorded
+    """
+    with open(path, "rb") as f:
+        header = dicom.read_file(f, stop_before_pixels=True)
+
+        # pydicom leaves the file at the start of the pixel data element
+        pixel_tell = f.tell()
+        element_bytes = f.read(12)
+
+    return LazyDicomSlice(path, header, pixel_layout=get_pixel_layout(header, pixel_tell, element_bytes))
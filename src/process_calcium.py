@@ -2,11 +2,16 @@
 
 # import libraries
 import os
-import dicom
+import pydicom as dicom
 
 import numpy as np
 import pandas as pd
 
+from scipy import ndimage
+
+# import user defined functions
+from src.process_roi import RoiMask
+
 # define parameters
 HOUNSFIELD_1_MIN = 130
 HOUNSFIELD_2_MIN = 200
@@ -15,6 +20,20 @@ HOUNSFIELD_4_MIN = 400
 
 MIN_AGASTON_AREA = 1
 
+# peak houndsfield weight thresholds
+HOUNSFIELD_BINS = [
+    HOUNSFIELD_1_MIN,
+    HOUNSFIELD_2_MIN,
+    HOUNSFIELD_3_MIN,
+    HOUNSFIELD_4_MIN,
+]
+
+# lesions are 8-connected within a slice and never span slices
+LESION_STRUCTURE = np.zeros([3, 3, 3], dtype=bool)
+LESION_STRUCTURE[:, :, 1] = True
+
+LESION_COLUMNS = ["lesion", "slice", "pixels", "area", "peak_hu", "weight", "score"]
+
 def rescale_dicom(curr_dicom):
     """
     INPUT:
@@ -35,45 +54,132 @@ def rescale_dicom(curr_dicom):
     # return
     return img
 
-def mask_matrix(mtx, roi_indx_lst):
+def build_hu_volume(dicom_lst, x_rng, y_rng, s_rng, dtype=None):
+    """
+    INPUTS:
+        dicom_lst:
+            the list of dicom files
+        x_rng, y_rng, s_rng:
+            the crop ranges of the image axes and slices
+        dtype:
+            output dtype; if None, int16 when the rescale is integral and
+            fits, else float32
+    OUTPUT:
+        the cropped matrix on a HU scale
+        [X, Y, Slice]
+    """
+    slice_lst = range(*s_rng)
+
+    # crop raw pixels before converting
+    raw_mtx = None
+    for i, curr_slice in enumerate(slice_lst):
+        img = dicom_lst[curr_slice].pixel_array[x_rng[0]:x_rng[1], y_rng[0]:y_rng[1]]
+        if raw_mtx is None:
+            raw_mtx = np.empty(img.shape + (len(slice_lst),), dtype=img.dtype)
+        raw_mtx[:, :, i] = img
+
+    # get intercept and slope of each slice
+    slope = np.array([float(dicom_lst[x].RescaleSlope) for x in slice_lst])
+    intercept = np.array([float(dicom_lst[x].RescaleIntercept) for x in slice_lst])
+
+    # determine compact dtype
+    if dtype is None:
+        dtype = np.float32
+        if np.all(slope == np.round(slope)) and np.all(intercept == np.round(intercept)):
+            bounds = np.concatenate([slope * raw_mtx.min(), slope * raw_mtx.max()]) + np.tile(intercept, 2)
+            int16_info = np.iinfo(np.int16)
+            if bounds.min() >= int16_info.min and bounds.max() <= int16_info.max:
+                dtype = np.int16
+
+    # apply transform in place
+    hu_mtx = raw_mtx.astype(dtype)
+    if np.any(slope != 1):
+        hu_mtx *= slope.astype(dtype)
+    hu_mtx += intercept.astype(dtype)
+
+    return hu_mtx
+
+def get_roi_volume_mask(roi_indx_lst, shape):
     """
     INPUTS:
-        mtx:
-            the input matrix
         roi_indx_lst:
             the list of coordinate tuples
+        shape:
+            the shape of the cropped matrix
     OUTPUT:
-        the non roi masked matrix
+        boolean matrix of the roi in cropped (X, Y, Slice) order
     """
     # make matrix to subtract off vals
-    roi_mtx = np.stack(roi_indx_lst)
-    min_vals = roi_mtx.min(axis=0)
-    roi_mtx = roi_mtx - min_vals
-    roi_mtx = np.stack([roi_mtx[:, 1], roi_mtx[:, 0], roi_mtx[:, 2]]).T
-
-    # get all indicies of matrix
-    bins = np.indices(mtx.shape)
-    pos = np.stack(bins, axis=-1).reshape([-1, 3])
+    roi_mtx = np.asarray(roi_indx_lst)
+    roi_mtx = roi_mtx - roi_mtx.min(axis=0)
 
-    # convert to list of tuples
-    roi_tpl_lst = [tuple(x) for x in roi_mtx.tolist()]
-    pos_tpl_lst = [tuple(x) for x in pos.tolist()]
+    # set roi voxels
+    vol_mask = np.zeros(shape, dtype=bool)
+    vol_mask[roi_mtx[:, 1], roi_mtx[:, 0], roi_mtx[:, 2]] = True
 
-    # get coordinates not in ROIs
-    diff_set = set(pos_tpl_lst).difference(roi_tpl_lst)
+    return vol_mask
 
-    # make a matrix
-    not_in_roi_mtx = np.stack(diff_set)
+def roi_mask_to_volume_mask(roi_mask):
+    """
+    INPUTS:
+        roi_mask:
+            the RoiMask of the roi
+    OUTPUT:
+        [0] vol_mask:
+            read only boolean matrix of the roi in cropped (X, Y, Slice)
+            order; every slice is a view of the same 2D mask
+        [1] ranges:
+            the Y, X and Slice ranges of the crop in image coordinates
+    """
+    # crop to roi pixels
+    y_indx, x_indx = np.nonzero(roi_mask.mask)
+    y_rng = y_indx.min(), y_indx.max() + 1
+    x_rng = x_indx.min(), x_indx.max() + 1
+    crop = roi_mask.mask[y_rng[0]:y_rng[1], x_rng[0]:x_rng[1]]
+
+    # broadcast over slices without copying
+    n_slices = roi_mask.slice_range[1] - roi_mask.slice_range[0]
+    vol_mask = np.broadcast_to(crop.T[:, :, None], crop.T.shape + (n_slices,))
+
+    # move to image coordinates
+    origin = roi_mask.origin
+    ranges = (
+        (y_rng[0] + origin[0], y_rng[1] + origin[0]),
+        (x_rng[0] + origin[1], x_rng[1] + origin[1]),
+        tuple(roi_mask.slice_range),
+    )
+
+    return vol_mask, ranges
 
-    # move to lists
-    zero_msk_indx = not_in_roi_mtx.T.tolist()
+def mask_matrix(mtx, roi_indx_lst):
+    """
+    INPUTS:
+        mtx:
+            the input matrix
+        roi_indx_lst:
+            the list of coordinate tuples
+    OUTPUT:
+        the non roi masked matrix
+    """
+    vol_mask = get_roi_volume_mask(roi_indx_lst, mtx.shape)
 
     # mask indicies that are not in valid
-    mskd_mtx = mtx.copy()
-    mskd_mtx[zero_msk_indx] = 0
+    return np.where(vol_mask, mtx, 0)
+
+def mask_matrix_from_roi(mtx, roi_mask):
+    """
+    INPUTS:
+        mtx:
+            the input matrix, cropped to the roi pixels
+        roi_mask:
+            the RoiMask of the roi
+    OUTPUT:
+        the non roi masked matrix
+    """
+    vol_mask, _ = roi_mask_to_volume_mask(roi_mask)
 
-    # returns matrix
-    return mskd_mtx
+    # mask indicies that are not in valid
+    return np.where(vol_mask, mtx, 0)
 
 def get_max_hounsfield(roi_mtx):
     """
@@ -134,6 +240,65 @@ def get_agatston_score(mskd_mtx, px_area):
     # return
     return total_calcium
 
+def get_lesion_table(mskd_mtx, px_area, slice_offset=0):
+    """
+    INPUTS:
+        mskd_mtx:
+            masked matrix where values below 130 supressed
+        px_area:
+            the product of pixel spacing from dicom
+        slice_offset:
+            series index of the first slice of mskd_mtx
+    OUTPUT:
+        dataframe with one row per connected lesion in a slice: its slice,
+        pixel count, area, peak houndsfield, weight (0 to 4) and score
+    """
+    # label lesions of each slice
+    labels, n_lesions = ndimage.label(mskd_mtx > 0, structure=LESION_STRUCTURE)
+    if not n_lesions:
+        return pd.DataFrame(columns=LESION_COLUMNS)
+
+    lesion_indx = np.arange(1, n_lesions + 1)
+
+    # get lesion sizes, peaks and slices
+    pxls = np.bincount(labels.ravel(), minlength=n_lesions + 1)[1:]
+    peak_hu = ndimage.maximum(mskd_mtx, labels, lesion_indx)
+    slice_indx = [x[2].start + slice_offset for x in ndimage.find_objects(labels)]
+
+    # get weighted area; ignore lesions below minimum area
+    area = pxls * px_area
+    weight = np.digitize(peak_hu, HOUNSFIELD_BINS)
+    score = np.where(area > MIN_AGASTON_AREA, area * weight, 0)
+
+    return pd.DataFrame({
+        "lesion": lesion_indx,
+        "slice": slice_indx,
+        "pixels": pxls,
+        "area": area,
+        "peak_hu": peak_hu,
+        "weight": weight,
+        "score": score,
+    }, columns=LESION_COLUMNS)
+
+def get_lesion_agatston_score(mskd_mtx, px_area, slice_offset=0):
+    """
+    INPUTS:
+        mskd_mtx:
+            masked matrix where values below 130 supressed
+        px_area:
+            the product of pixel spacing from dicom
+        slice_offset:
+            series index of the first slice of mskd_mtx
+    OUTPUT:
+        [0] total_calcium:
+            the total of the per lesion agatston scores
+        [1] lesion_df:
+            the per lesion table from get_lesion_table
+    """
+    lesion_df = get_lesion_table(mskd_mtx, px_area, slice_offset)
+
+    return float(lesion_df["score"].sum()), lesion_df
+
 def calculate_calcium_volume(mskd_mtx, pixel_spacing, slice_thickness):
     """
     INPUT:
@@ -155,36 +320,43 @@ def calculate_calcium_volume(mskd_mtx, pixel_spacing, slice_thickness):
     # calculate volume
     return num_vox * vol_vox
 
-def get_calcium_measurements(roi_indx_lst, dicom_lst, debug=False):
+def get_calcium_measurements(roi_indx_lst, dicom_lst, debug=False, scoring="slice", return_lesions=False):
     """
     INPUTS:
         roi_indx_lst:
             the list of coordinate tuples
         dicom_lst:
             the list of dicom files
+        scoring:
+            slice to weight each slice by its peak, or lesion to weight each
+            connected lesion by its own peak
+        return_lesions:
+            if True, also return the per lesion table
     OUTPUT:
-        the calculated calcium score
+        [0] ca_score:
+            the calculated calcium score
+        [1] ca_vol:
+            the calcium volume in mm^3
+        [2] lesion_df:
+            only if return_lesions; the per lesion table from
+            get_lesion_table, computed for either scoring
     """
-    # get vals
-    y_vals = [x[0] for x in roi_indx_lst]
-    x_vals = [x[1] for x in roi_indx_lst]
-    s_vals = [x[2] for x in roi_indx_lst]
-
-    # get min and max
-    y_rng = min(y_vals), max(y_vals) + 1
-    x_rng = min(x_vals), max(x_vals) + 1
-    s_rng = min(s_vals), max(s_vals) + 1
+    if isinstance(roi_indx_lst, RoiMask):
+        # get crop from roi mask
+        vol_mask, (y_rng, x_rng, s_rng) = roi_mask_to_volume_mask(roi_indx_lst)
+    else:
+        # get min and max
+        roi_mtx = np.asarray(roi_indx_lst)
+        y_rng, x_rng, s_rng = zip(roi_mtx.min(axis=0), roi_mtx.max(axis=0) + 1)
 
-    # form matrix
-    pxl_lst = [rescale_dicom(dicom_lst[x]) for x in range(*s_rng)]
-    pxl_lst = [x[x_rng[0]:x_rng[1], y_rng[0]:y_rng[1]] for x in pxl_lst]
-    pxl_mtx = np.stack(pxl_lst, axis=-1)
+    # form matrix on HU scale
+    msk_mtx = build_hu_volume(dicom_lst, x_rng, y_rng, s_rng)
 
-    # mask matrix
-    msk_mtx = mask_matrix(pxl_mtx, roi_indx_lst)
+    if not isinstance(roi_indx_lst, RoiMask):
+        vol_mask = get_roi_volume_mask(roi_mtx, msk_mtx.shape)
 
-    # mask below min houndsfield threshold
-    msk_mtx[np.where(msk_mtx < HOUNSFIELD_1_MIN)] = 0
+    # mask matrix and below min houndsfield threshold in place
+    msk_mtx[~vol_mask | (msk_mtx < HOUNSFIELD_1_MIN)] = 0
 
     # get pixel spacing
     px_area = np.prod(dicom_lst[0].PixelSpacing)
@@ -193,9 +365,18 @@ def get_calcium_measurements(roi_indx_lst, dicom_lst, debug=False):
     slice_thickness = abs(float(dicom_lst[0][0x0018, 0x0050].value))
 
     # get calcium score
-    ca_score = get_agatston_score(msk_mtx.copy(), px_area)
+    if scoring == "lesion":
+        ca_score, lesion_df = get_lesion_agatston_score(msk_mtx, px_area, s_rng[0])
+    elif scoring == "slice":
+        ca_score = get_agatston_score(msk_mtx, px_area)
+        lesion_df = get_lesion_table(msk_mtx, px_area, s_rng[0]) if return_lesions else None
+    else:
+        raise AssertionError("Scoring must be either slice or lesion. Got {}".format(scoring))
 
     # get volume
-    ca_vol = calculate_calcium_volume(msk_mtx.copy(), px_area, slice_thickness)
+    ca_vol = calculate_calcium_volume(msk_mtx, px_area, slice_thickness)
+
+    if return_lesions:
+        return ca_score, ca_vol, lesion_df
 
     return ca_score, ca_vol
@@ -6,7 +6,12 @@ import os
 import numpy as np
 import pandas as pd
 
-def get_roi_indicies(path_indx, dicom_dims, slice_range):
+from collections import namedtuple
+
+# 2D mask of the roi bounding box, its (X, Y) origin and the roi slice range
+RoiMask = namedtuple("RoiMask", ["mask", "origin", "slice_range"])
+
+def get_roi_mask(path_indx, dicom_dims, slice_range):
     """
     INPUT:
         path_indx:
@@ -16,25 +21,62 @@ def get_roi_indicies(path_indx, dicom_dims, slice_range):
         slice_range:
             the ranges of the roi
     OUTPUT:
-        the X, Y, Slice of the coordinates in the ROI
+        RoiMask of the pixels in the roi; only pixels in the bounding box of
+        the path are tested. None if there is no roi
     """
 
     # see if we have indicies
     if not path_indx:
-        return []
+        return None
+
+    # get bounding box clipped to image
+    verts = path_indx.vertices
+    lower = np.maximum(np.floor(verts.min(axis=0)).astype(int), 0)
+    upper = np.minimum(np.ceil(verts.max(axis=0)).astype(int) + 1, dicom_dims)
+    box_dims = np.maximum(upper - lower, 0)
 
-    # get dimentions
-    bins = np.indices(tuple(dicom_dims))
-    pos = np.stack(bins, axis=-1).reshape([-1, 2])
+    # get valid indicies within bounding box
+    bins = np.indices(tuple(box_dims))
+    pos = np.stack(bins, axis=-1).reshape([-1, 2]) + lower
+    mask = path_indx.contains_points(pos).reshape(tuple(box_dims))
 
-    # get valid indicies
-    vld_pos = pos[path_indx.contains_points(pos)]
+    return RoiMask(mask, tuple(lower.tolist()), tuple(slice_range))
+
+def roi_mask_to_indicies(roi_mask):
+    """
+    INPUT:
+        roi_mask:
+            the RoiMask of the roi
+    OUTPUT:
+        the X, Y, Slice of the coordinates in the ROI
+    """
+    vld_pos = np.stack(np.nonzero(roi_mask.mask), axis=-1) + roi_mask.origin
 
     # append slice
-    vld_lst = [np.insert(vld_pos, 2, x, axis=-1) for x in range(*slice_range)]
+    vld_lst = [np.insert(vld_pos, 2, x, axis=-1) for x in range(*roi_mask.slice_range)]
 
     # concatenate
     vld_indx = np.concatenate(vld_lst)
 
     # return
     return [tuple(x) for x in vld_indx.tolist()]
+
+def get_roi_indicies(path_indx, dicom_dims, slice_range):
+    """
+    INPUT:
+        path_indx:
+            the path indx of the roi
+        dicom_dims:
+            the XY shape of the input
+        slice_range:
+            the ranges of the roi
+    OUTPUT:
+        the X, Y, Slice of the coordinates in the ROI
+    """
+    roi_mask = get_roi_mask(path_indx, dicom_dims, slice_range)
+
+    # see if we have indicies
+    if roi_mask is None:
+        return []
+
+    return roi_mask_to_indicies(roi_mask)
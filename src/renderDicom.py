@@ -7,8 +7,6 @@ import math
 import datetime
 
 import numpy as np
-import pandas as pd
-import deepdish as dd
 import matplotlib as mpl
 
 from math import floor
@@ -16,16 +14,25 @@ from itertools import product
 from matplotlib import pyplot, cm, path, patches
 from matplotlib.patches import Circle
 from matplotlib.widgets import Cursor, LassoSelector, RectangleSelector
+from matplotlib.backend_bases import TimerBase
 
 # import user fefined libraries
 from src.utility import import_anatomic_settings, REGEX_PARSE
 from src.process_roi import get_roi_indicies
-from src.interpolation import cine_interpolate, linear_interpolate_slices
+from src.interpolation import CineTrajectory
+from src.slice_cache import SliceCache
+from src.annotation_store import AnnotationStore
+from src.journal import replay_journal
+from src.annotation_io import load_annotations, decode_annotations
+from src.instrumentation import NullProfiler
 
 # global messages
 INITIAL_USR_MSG = "Please select a anatomic landmark"
 CONTRAST_SCALE = 5
 
+# minimum time between rendered frames in ms
+FRAME_INTERVAL = 16
+
 DEFAULT_Z_AROUND_CENTER = 0
 
 COLOR_MAP = [
@@ -49,7 +56,8 @@ mpl.rcParams['keymap.quit'] = ''
 mpl.rcParams['keymap.grid'] = ''
 mpl.rcParams['keymap.yscale'] = ''
 mpl.rcParams['keymap.xscale'] = ''
-mpl.rcParams['keymap.all_axes'] = ''
+if 'keymap.all_axes' in mpl.rcParams:
+    mpl.rcParams['keymap.all_axes'] = ''
 mpl.rcParams['toolbar'] = 'None'
 
 mpl.rcParams['figure.figsize'] = (7.5, 7.5)
@@ -63,7 +71,7 @@ COORD_MAP = {
 
 # main class
 class RenderDicomSeries:
-    def __init__(self, ax, dicom_lst, settings_path, previous_path=None):
+    def __init__(self, ax, dicom_lst, settings_path, previous_path=None, volume=None, slice_cache=None, prefetch_radius=0, journal=None, journal_events=None, profiler=None):
         # import settings
         settings = import_anatomic_settings(settings_path)
 
@@ -85,81 +93,69 @@ class RenderDicomSeries:
 
             self.roi_colors = dict(zip(settings["roi_landmarks"], COLOR_MAP))
 
+        # cine interpolation type
+        self.interpolation_type = settings.get("interpolation", "linear")
+
         # initialize valid location types list
         self.valid_location_types = [v for k,v in self.locations_markers.items()]
 
         # store imputs
         self.ax = ax
         self.dicom_lst = dicom_lst
+        self.volume = volume
+        self.slice_cache = slice_cache
+        self.prefetch_radius = prefetch_radius
+        self.journal = journal
+
+        # time handlers and frames if instrumented
+        self.profiler = profiler or NullProfiler()
+        if self.profiler.enabled:
+            self._on_key_press = self.profiler.wrap("key_press", self._on_key_press)
+            self._on_click = self.profiler.wrap("click", self._on_click)
+            self._on_movement = self.profiler.wrap("movement", self._on_movement)
+            self._lasso = self.profiler.wrap("lasso", self._lasso)
+            self._render_frame = self.profiler.wrap("frame", self._render_frame)
 
         # initialize current selections
         self.curr_selection = None
         self.curr_idx = 0
         self.scrolling = False
 
+        # use individual cine frames if possible
+        self.cine_series = int(self.dicom_lst[0].CardiacNumberOfImages)
+
+        # lol hack
+        if self.cine_series == 1: self.cine_series = None
+
         # render to image
-        self.im = self.ax.imshow(self.dicom_lst[self.curr_idx].pixel_array, cmap='gray')
+        self.im = self.ax.imshow(self._get_pixel_array(self.curr_idx), cmap='gray')
 
         # remember default contrast
         self.default_contrast_window = self.im.get_clim()
 
-        # use individual cine frames if possible
-        self.cine_series = int(self.dicom_lst[0].CardiacNumberOfImages)
+        # initialize blitting and frame scheduling
+        self._init_blit()
+        self._init_frame_scheduler()
 
-        # lol hack
-        if self.cine_series == 1: self.cine_series = None
+        # keys of currently visible points; set before restored points are drawn
+        self.visible_keys = set()
 
-        if self.cine_series:
-            cine_point_lst = ["{}_{}".format(x, y) for x, y in product(*[point_lst, range(self.cine_series)])]
+        # load data if previous_path specified; either a file or a loaded dict
+        if previous_path is None:
+            # initialize data dict
+            self.annotations = AnnotationStore.from_landmarks(point_lst, roi_lst, self.cine_series)
+        elif isinstance(previous_path, dict):
+            self.annotations = AnnotationStore(decode_annotations(previous_path), self.cine_series)
         else:
-            cine_point_lst = [x for x in point_lst]
-
-        # load data if previous_path specified
-        if previous_path is not None:
             # load dictionaries
-            self.data_dict = dd.io.load(previous_path)
-
-            # initialize old circle data
-            self.circle_data = {}
-            for lndmrk, loc in self.data_dict["point_locations"].items():
-                if loc:
-                    circ = Circle((loc), 1, edgecolor='red', fill=True)
-                    self.circle_data[lndmrk] = circ
-                    self.circle_data[lndmrk].PLOTTED = False
-                    self.ax.add_patch(circ)
-                else:
-                    self.circle_data[lndmrk] = None
-
-
-            # loops through landmakrs to set them (only 1 per landmark)
-            interpolated_points = []
-            for k, v in self.data_dict["point_locations"].items():
-                if not len(set(self.locations_markers.values()) - set(interpolated_points)):
-                    break
-                elif v:
-                    if self.cine_series:
-                        curr_k_name = k.split("_")[0]
-                    else:
-                        curr_k_name = k
-                    interpolated_points.append(curr_k_name)
-                    if v:
-                        self._update_set_interpolated_points(curr_k_name)
+            self.annotations = AnnotationStore(load_annotations(previous_path), self.cine_series)
 
-        else:
-            # initialize data dict
-            self.data_dict = {
-                # all
-                "slice_location": dict(zip(cine_point_lst+roi_lst, [None for x in cine_point_lst+roi_lst])),
-                # point
-                "point_locations": dict(zip(cine_point_lst, [None for x in cine_point_lst])),
-                # roi
-                "vert_data": dict(zip(roi_lst, [None for x in roi_lst])),
-                "roi_bounds": dict(zip(roi_lst, [None for x in roi_lst])),
-            }
-
-            # initialize old circle data
-            self.circle_data = dict(zip(cine_point_lst, [None for x in cine_point_lst]))
-            self.roi_data = dict(zip(roi_lst, [None for x in roi_lst]))
+        # apply edits journaled after the last save
+        if journal_events:
+            replay_journal(self.annotations, journal_events)
+
+        # rebuild all annotation patches; drawn once below
+        self._restore_annotations(roi_lst)
 
         # finish initialiazation
         self._update_image(self.curr_idx)
@@ -190,6 +186,17 @@ class RenderDicomSeries:
         self.cid_release = self.ax.figure.canvas.mpl_connect(
             'button_release_event', self._on_release)
 
+    def add_blit_widget(self, widget):
+        """
+        INPUT:
+            widget:
+                a blitting widget on the same axes, such as a Cursor
+        EFFECT:
+            refreshes the widget background after every blitted frame so it
+            includes the image
+        """
+        self.blit_widgets.append(widget)
+
     def disconnect(self):
         """
         EFFECT:
@@ -204,7 +211,151 @@ class RenderDicomSeries:
         OUTPUT:
             returns data dict
         """
-        return self.data_dict
+        return self.annotations.to_dict()
+
+    def _record(self, event, key, **values):
+        """
+        INPUTS:
+            event:
+                the kind of annotation edit
+            key:
+                the annotation key edited
+        EFFECT:
+            appends the edit to the session journal if one is kept
+        """
+        if self.journal is not None:
+            self.journal.record(event, key, **values)
+
+    def _init_blit(self):
+        """
+        EFFECT:
+            renders the image and annotations as animated artists if the
+            canvas supports blitting
+        """
+        canvas = self.ax.figure.canvas
+
+        # initialize blit state
+        self.useblit = getattr(canvas, "supports_blit", False)
+        self.blit_background = None
+        self.blit_widgets = []
+
+        if self.useblit:
+            self.im.set_animated(True)
+            self.cid_draw = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _add_patch(self, patch):
+        """
+        INPUT:
+            patch:
+                annotation patch
+        EFFECT:
+            adds patch to axes, blitted if possible; added as an artist so
+            the axes limits are not recomputed for every patch
+        """
+        patch.set_animated(self.useblit)
+        self.ax.add_artist(patch)
+
+    def _draw_animated(self):
+        """
+        EFFECT:
+            draws the image and visible annotation patches
+        """
+        self.ax.draw_artist(self.im)
+
+        # only points on this frame, not every patch created
+        for k in self.visible_keys:
+            if self.circle_data.get(k) and self.circle_data[k].get_visible():
+                self.ax.draw_artist(self.circle_data[k])
+
+        for patch in self.roi_data.values():
+            if patch is not None and patch.get_visible():
+                self.ax.draw_artist(patch)
+
+        # keep widget backgrounds in sync with the new frame
+        for widget in self.blit_widgets:
+            widget.clear(None)
+
+    def _on_draw(self, event):
+        """
+        INPUT:
+            event:
+                the draw event from matplotlib
+        EFFECT:
+            caches the static background after a full draw
+        """
+        canvas = self.ax.figure.canvas
+        if canvas.is_saving():
+            return
+
+        self.blit_background = canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+        canvas.blit(self.ax.bbox)
+
+    def _redraw(self):
+        """
+        EFFECT:
+            redraws the image and annotations; blits over the cached
+            background if possible, else schedules a full draw
+        """
+        canvas = self.ax.figure.canvas
+
+        with self.profiler.section("draw"):
+            if not self.useblit or self.blit_background is None:
+                canvas.draw_idle()
+                return
+
+            canvas.restore_region(self.blit_background)
+            self._draw_animated()
+            canvas.blit(self.ax.bbox)
+
+    def _init_frame_scheduler(self):
+        """
+        EFFECT:
+            sets up a single shot timer so state changes between frames are
+            rendered once; renders immediately if the backend has no timers
+        """
+        self.frame_pending = False
+        self.image_dirty = False
+
+        timer = self.ax.figure.canvas.new_timer(interval=FRAME_INTERVAL)
+        if type(timer) is TimerBase:
+            self.frame_timer = None
+        else:
+            timer.single_shot = True
+            timer.add_callback(self._render_frame)
+            self.frame_timer = timer
+
+    def _request_frame(self):
+        """
+        EFFECT:
+            schedules the next frame; repeated requests before it renders
+            are coalesced
+        """
+        if self.frame_timer is None:
+            self._render_frame()
+        elif not self.frame_pending:
+            self.frame_pending = True
+            self.frame_timer.start()
+
+    def _render_frame(self):
+        """
+        EFFECT:
+            renders pending state; only the latest image index is fetched
+        """
+        self.frame_pending = False
+
+        # render dicom image
+        if self.image_dirty:
+            self.image_dirty = False
+
+            with self.profiler.section("fetch"):
+                self.im.set_data(self._get_pixel_array(self.curr_idx))
+
+                # decode neighbors in the background
+                if self.slice_cache is not None and self.volume is None:
+                    self.slice_cache.prefetch(self._get_neighbor_indicies(self.curr_idx))
+
+        self._redraw()
 
     def _get_cine_and_slice(self, indx):
         """
@@ -220,121 +371,219 @@ class RenderDicomSeries:
 
         return cine_frame, slice
 
+    def _get_pixel_array(self, indx):
+        """
+        INPUT:
+            indx:
+                the index of self.dicom_lst
+        OUTPUT:
+            the image; a view into the volume cache if one is used
+        """
+        if self.volume is None and self.slice_cache is None:
+            return self.dicom_lst[indx].pixel_array
+        elif self.volume is None:
+            return self.slice_cache.get(indx)
+        elif self.cine_series:
+            return self.volume[indx // self.cine_series, indx % self.cine_series]
+        else:
+            return self.volume[indx, 0]
+
+    def _get_neighbor_indicies(self, indx):
+        """
+        INPUT:
+            indx:
+                the index of self.dicom_lst
+        OUTPUT:
+            indicies of the neighboring slices and cine frames, nearest first
+        """
+        cine_frame, slice = self._get_cine_and_slice(indx)
+
+        neighbor_lst = []
+        for offset in range(1, self.prefetch_radius + 1):
+            # neighboring slices
+            if self.cine_series:
+                neighbor_lst.append(indx + offset * self.cine_series)
+                neighbor_lst.append(indx - offset * self.cine_series)
+            else:
+                neighbor_lst.append(indx + offset)
+                neighbor_lst.append(indx - offset)
+
+            # neighboring cine frames within the slice
+            if self.cine_series:
+                neighbor_lst.append(slice * self.cine_series + (cine_frame + offset) % self.cine_series)
+                neighbor_lst.append(slice * self.cine_series + (cine_frame - offset) % self.cine_series)
+
+        return [x for x in neighbor_lst if 0 <= x < len(self.dicom_lst) and x != indx]
+
     def _update_image(self, new_idx):
         """
         INPUTS:
             new_idx:
                 the index of self.dicom_lst to render
         EFFECT:
-            updates image
+            updates image on the next frame
         """
 
-        # set curr inde and image
+        # set curr inde; image is fetched when the frame renders
         self.curr_idx = new_idx
-
-        # render dicom image
-        self.im.set_data(self.dicom_lst[self.curr_idx].pixel_array)
+        self.image_dirty = True
 
         # get x and y limits
         self.x_max = self.ax.get_xlim()[1]
         self.y_max = self.ax.get_ylim()[0]
 
+        # render valid points
+        self._update_visible_points()
+
+        # update view
+        self._request_frame()
+
+    def _update_visible_points(self):
+        """
+        EFFECT:
+            shows points on the current slice and cine frame; only the
+            previously and currently visible points are touched
+        """
         # get slice and cine frame from index
         cine_frame, slice = self._get_cine_and_slice(self.curr_idx)
+        curr_keys = set(self.annotations.keys_at(slice, cine_frame))
 
-        # render valid rois
-        for k, v in self.circle_data.items():
-            # determine bools
-            correct_slice = self.data_dict["slice_location"][k] == slice
-            if self.cine_series:
-                correct_cine = int(k.split("_")[1]) == cine_frame
-            else:
-                correct_cine = True
+        # hide points no longer on frame
+        for k in self.visible_keys - curr_keys:
+            if self.circle_data.get(k):
+                self.circle_data[k].set_visible(False)
 
-            # show circle if both are true
-            if v:
-                if correct_cine and correct_slice:
-                    v.set_visible(True)
-                else:
-                    v.set_visible(False)
+        # show points on frame
+        for k in curr_keys:
+            if self.circle_data.get(k):
+                self.circle_data[k].set_visible(True)
 
-        # update view
-        self.ax.figure.canvas.draw()
+        self.visible_keys = curr_keys
 
-    def _update_set_interpolated_points(self, landmark):
+    def _init_trajectories(self):
         """
-        INPUT:
-            curr_selection:
-                the currently selected landmark
-            landmark:
-                the landmark to update the cine points for
         EFFECT:
-            draws predicted interpolated points
+            builds the cine trajectory of every landmark from the annotations
+            in a single interpolation pass
         """
-        # get slice and cine frame from index
-        cine_frame, slice = self._get_cine_and_slice(self.curr_idx)
+        self.trajectories = {}
+        if not self.cine_series:
+            return
 
-        # add predicted interpolated coords
-        if self.cine_series:
+        landmark_lst = list(self.annotations.landmark_keys)
 
-            # make list of coords and time points
-            coord_lst = []
-            time_lst = []
-            slice_lst = []
-            for k, v in self.data_dict["point_locations"].items():
-                # escape from loop
-                if not k.split("_")[0] == landmark:
-                    continue
-                elif not v:
+        # make arrays of coords, slices and annotated frames
+        coord_ary = np.zeros([len(landmark_lst), self.cine_series, 2])
+        slice_ary = np.zeros([len(landmark_lst), self.cine_series])
+        mask = np.zeros([len(landmark_lst), self.cine_series], dtype=bool)
+        for j, landmark in enumerate(landmark_lst):
+            for i, k in self.annotations.landmark_keys[landmark].items():
+                v = self.annotations.point_locations[k]
+                if not v:
                     continue
 
-                # append time and coords
-                time_lst.append(int(k.split("_")[1]))
-                coord_lst.append(v)
-                slice_lst.append(self.data_dict["slice_location"][k])
+                coord_ary[j, i] = v
+                slice_ary[j, i] = self.annotations.slice_location[k]
+                mask[j, i] = True
 
-            # if list is empty, then try to remove cirlces
-            if not len(time_lst):
-                for i in range(self.cine_series):
-                    k = "{}_{}".format(landmark, i)
-                    self.circle_data[k] = None
+        traj_lst = CineTrajectory.from_batch(coord_ary, slice_ary, mask, self.interpolation_type)
+        self.trajectories = dict(zip(landmark_lst, traj_lst))
 
-                # escape
-                return
+    def _restore_annotations(self, roi_lst):
+        """
+        INPUT:
+            roi_lst:
+                list of roi landmarks
+        EFFECT:
+            creates marked points, predicted points and roi patches of the
+            loaded annotations in one pass without drawing
+        """
+        # marked points
+        self.circle_data = {}
+        for lndmrk, loc in self.annotations.point_locations.items():
+            if loc:
+                circ = Circle((loc), 1, edgecolor='red', fill=True)
+                self.circle_data[lndmrk] = circ
+                self.circle_data[lndmrk].PLOTTED = False
+                self.circle_data[lndmrk].set_visible(False)
+                self._add_patch(circ)
+            else:
+                self.circle_data[lndmrk] = None
+
+        # rois
+        self.roi_data = dict(zip(roi_lst, [None for x in roi_lst]))
+        for lndmrk in roi_lst:
+            if self.annotations.vert_data.get(lndmrk) is not None:
+                self.roi_data[lndmrk] = self._add_roi_patch(lndmrk, self.annotations.vert_data[lndmrk])
+
+        # interpolate all landmarks at once and set predicted points
+        self._init_trajectories()
+        for landmark, traj in self.trajectories.items():
+            if traj.frames:
+                self._update_predicted_points(landmark, np.arange(self.cine_series), redraw=False)
 
-            # make arrays
-            time_ary = np.array(time_lst)
-            coord_ary = np.concatenate(coord_lst).reshape(-1, 2)
-            slice_ary = np.array(slice_lst)
+    def _add_roi_patch(self, landmark, ver_path):
+        """
+        INPUTS:
+            landmark:
+                the roi landmark
+            ver_path:
+                the Path of the lasso
+        OUTPUT:
+            the added roi patch
+        """
+        curr_class = REGEX_PARSE.search(landmark).group()
+        curr_color = self.roi_colors[curr_class]
+        patch = patches.PathPatch(ver_path, facecolor=curr_color, alpha = 0.4)
+        self._add_patch(patch)
 
-            # get index and sort
-            indx = np.argsort(time_ary)
-            time_ary = time_ary[indx]
-            coord_ary = coord_ary[indx]
-            slice_ary = slice_ary[indx]
+        return patch
 
-            coords, times = cine_interpolate(coord_ary, time_ary)
-            slice_interp_ary = linear_interpolate_slices(slice_ary, time_ary)[0]
+    def _update_predicted_points(self, landmark, frame_ary, redraw=True):
+        """
+        INPUT:
+            landmark:
+                the landmark to update the cine points for
+            frame_ary:
+                the cine frames whose interpolated values changed
+            redraw:
+                if False, the caller draws once all landmarks are updated
+        EFFECT:
+            creates, moves or removes predicted points of those frames only
+        """
+        traj = self.trajectories[landmark]
 
-            # add predicted values
-            for i in range(len(times)):
-                k = "{}_{}".format(landmark, i)
+        for i in frame_ary:
+            k = "{}_{}".format(landmark, i)
 
-                # escape annotated
-                if self.data_dict["point_locations"][k]:
-                    continue
+            # escape annotated
+            if traj.mask[i]:
+                continue
 
-                i_circ = Circle((coords[0][i], coords[1][i]), 1, edgecolor='green', fill=True)
+            # if landmark has no points, then remove predicted cirlces
+            if not traj.frames:
+                if self.circle_data[k] is not None:
+                    self.circle_data[k].remove()
+                self.circle_data[k] = None
+                continue
+
+            # add predicted values; existing predicted circles are moved
+            if self.circle_data[k] is None:
+                i_circ = Circle(traj.coords[i], 1, edgecolor='green', fill=True)
 
                 self.circle_data[k] = i_circ
                 self.circle_data[k].PLOTTED = True
                 self.circle_data[k].set_visible(False)
-                self.ax.add_patch(i_circ)
+                self._add_patch(i_circ)
+            else:
+                self.circle_data[k].set_center(traj.coords[i])
 
-                self.data_dict["slice_location"][k] = slice_interp_ary[i]
+            self.annotations.set_slice(k, traj.slices[i])
 
         # draw image
-        self.ax.figure.canvas.draw()
+        if redraw:
+            self._update_visible_points()
+            self._request_frame()
 
     def _on_click(self, event):
         """
@@ -353,7 +602,7 @@ class RenderDicomSeries:
             self.last_x, self.last_y = event.x, event.y
 
             # draw image
-            self.ax.figure.canvas.draw()
+            self._request_frame()
 
         elif event.button == 1:
             # get current cine frame and slice
@@ -362,10 +611,8 @@ class RenderDicomSeries:
             # return if nothing is selected
             if self.curr_selection is None:
                 return
-            elif self.cine_series:
-                curr_cine_key = "{}_{}".format(self.curr_selection, cine_frame)
             else:
-                curr_cine_key = self.curr_selection
+                curr_cine_key = self.annotations.get_key(self.curr_selection, cine_frame)
 
             # set default xy_circle_rad
             roi_xy_rad = None
@@ -382,17 +629,23 @@ class RenderDicomSeries:
 
             self.circle_data[curr_cine_key] = circ
             self.circle_data[curr_cine_key].PLOTTED = True
-            self.ax.add_patch(circ)
+            self._add_patch(circ)
 
             # add slice_location and circle location information
-            self.data_dict["slice_location"][curr_cine_key] = slice
-            self.data_dict["point_locations"][curr_cine_key] = (event.xdata, event.ydata)
+            self.annotations.set_point(curr_cine_key, (event.xdata, event.ydata), slice)
+            self._record("point", curr_cine_key, loc=[float(event.xdata), float(event.ydata)], slice=int(slice))
 
-            # set green points
-            self._update_set_interpolated_points(self.curr_selection)
+            # set green points of the changed segments
+            if self.cine_series:
+                traj = self.trajectories[self.curr_selection]
+                with self.profiler.section("interpolation"):
+                    changed_frames = traj.set_point(cine_frame, (event.xdata, event.ydata), slice)
+                self._update_predicted_points(self.curr_selection, changed_frames)
+            else:
+                self._update_visible_points()
 
             # draw image
-            self.ax.figure.canvas.draw()
+            self._request_frame()
 
     def _on_movement(self, event):
         """
@@ -487,7 +740,7 @@ class RenderDicomSeries:
         # resets contrast window
         elif event.key == "v":
             self.im.set_clim(self.default_contrast_window)
-            self.ax.figure.canvas.draw()
+            self._request_frame()
 
         # return results
         elif event.key == "return":
@@ -531,18 +784,13 @@ class RenderDicomSeries:
 
             # save verts indicies
             ver_path = path.Path(verts)
-            self.data_dict["vert_data"][self.curr_selection] = ver_path
 
             # save patch
-            curr_class = REGEX_PARSE.search(self.curr_selection).group()
-            curr_color = self.roi_colors[curr_class]
-            patch = patches.PathPatch(ver_path, facecolor=curr_color, alpha = 0.4)
-            self.roi_data[self.curr_selection] = patch
-            self.ax.add_patch(patch)
+            self.roi_data[self.curr_selection] = self._add_roi_patch(self.curr_selection, ver_path)
 
-            # add slice_location and circle location information
-            self.data_dict["slice_location"][self.curr_selection] = self.curr_idx
-            self.data_dict["roi_bounds"][self.curr_selection] = DEFAULT_Z_AROUND_CENTER
+            # add slice_location and roi information
+            self.annotations.set_roi(self.curr_selection, ver_path, self.curr_idx, DEFAULT_Z_AROUND_CENTER)
+            self._record("roi", self.curr_selection, verts=ver_path.vertices.tolist(), slice=int(self.curr_idx), bounds=DEFAULT_Z_AROUND_CENTER)
 
             # update image
             self._update_image(self.curr_idx)
@@ -579,38 +827,46 @@ class RenderDicomSeries:
         """
         cine_frame, slice = self._get_cine_and_slice(self.curr_idx)
 
-        if self.cine_series:
-            curr_cine_key = "{}_{}".format(self.curr_selection, cine_frame)
-        else:
-            curr_cine_key = self.curr_selection
-
         # return if nothing is selected
         if self.curr_selection is None:
             return
+
+        # rois are not per cine frame
+        elif self.curr_selection in self.roi_data:
+            if self.roi_data[self.curr_selection] is not None:
+                self.roi_data[self.curr_selection].remove()
+                self.roi_data[self.curr_selection] = None
+                self.annotations.clear_roi(self.curr_selection)
+                self._record("clear_roi", self.curr_selection)
+            return
+
+        curr_cine_key = self.annotations.get_key(self.curr_selection, cine_frame)
+
         # return if slice location not valid
-        elif self.data_dict["slice_location"][curr_cine_key] == None:
+        if self.annotations.slice_location[curr_cine_key] == None:
             return
 
         # test if already populated data to reset
-        if self.data_dict["point_locations"][curr_cine_key]:
+        if self.annotations.point_locations[curr_cine_key]:
 
-            # remove old point
-            self.data_dict["point_locations"][curr_cine_key] = None
+            # remove old point and slice location
+            self.annotations.clear_point(curr_cine_key)
+            self._record("clear_point", curr_cine_key)
 
             # remove old circle
             self.circle_data[curr_cine_key].remove()
             self.circle_data[curr_cine_key] = None
 
-            # remove slice location
-            self.data_dict["slice_location"][curr_cine_key] = None
-
-            # make interpolatd points
-            self._update_set_interpolated_points(self.curr_selection)
+            # make interpolatd points of the changed segments
+            if self.cine_series:
+                with self.profiler.section("interpolation"):
+                    changed_frames = self.trajectories[self.curr_selection].remove_point(cine_frame)
+                self._update_predicted_points(self.curr_selection, changed_frames)
         else:
             return
 
         # draw image
-        self.ax.figure.canvas.draw()
+        self._request_frame()
 
     def _next_image(self):
         """
@@ -695,7 +951,7 @@ class RenderDicomSeries:
         self.im.set_clim(curr_clim[0] - half_delta, curr_clim[1] + half_delta)
 
         # draw image
-        self.ax.figure.canvas.draw()
+        self._request_frame()
 
     def _shift_contrast_window(self, delta):
         """
@@ -717,7 +973,7 @@ class RenderDicomSeries:
         self.im.set_clim(curr_clim[0] + half_delta, curr_clim[1] + half_delta)
 
         # draw image
-        self.ax.figure.canvas.draw()
+        self._request_frame()
 
     def _close(self):
         """
@@ -726,11 +982,25 @@ class RenderDicomSeries:
         """
         pyplot.close()
 
-def plotDicom(dicom_lst, settings_path, previous_directory=None):
+def plotDicom(dicom_lst, settings_path, previous_directory=None, volume=None, cache_budget=None, prefetch_radius=0, journal=None, journal_events=None, profiler=None):
     """
     INPUTS:
         dicom:
             dicom object
+        previous_directory:
+            optional saved annotation file or already loaded annotation dict
+        volume:
+            optional (slice, cine, rows, cols) array of decoded images
+        cache_budget:
+            optional memory budget in bytes for cached decoded images
+        prefetch_radius:
+            number of neighboring slices and cine frames to decode ahead
+        journal:
+            optional AnnotationJournal recording edits as they are made
+        journal_events:
+            optional list of journaled edits to apply on startup
+        profiler:
+            optional EventProfiler timing viewer events
     EFFECT:
         plots dicom object and acts as hook for GUI funcitons
     """
@@ -743,17 +1013,30 @@ def plotDicom(dicom_lst, settings_path, previous_directory=None):
     ax.axis('off')
     cursor = Cursor(ax, useblit=True, color='red', linewidth=1)
 
+    # cache decoded images
+    if cache_budget is not None and volume is None:
+        slice_cache = SliceCache(dicom_lst, cache_budget)
+    else:
+        slice_cache = None
+
     # connect to function
     if previous_directory is None:
-        dicomRenderer = RenderDicomSeries(ax, dicom_lst, settings_path)
+        dicomRenderer = RenderDicomSeries(ax, dicom_lst, settings_path, volume=volume, slice_cache=slice_cache, prefetch_radius=prefetch_radius, journal=journal, journal_events=journal_events, profiler=profiler)
     else:
-        dicomRenderer = RenderDicomSeries(ax, dicom_lst, settings_path, previous_directory)
+        dicomRenderer = RenderDicomSeries(ax, dicom_lst, settings_path, previous_directory, volume, slice_cache, prefetch_radius, journal, journal_events, profiler)
 
+    dicomRenderer.add_blit_widget(cursor)
     dicomRenderer.connect()
     pyplot.show()
 
     # clean up
     dicomRenderer.disconnect()
 
+    # report cache use
+    if slice_cache is not None:
+        slice_cache.close()
+        sys.stdout.write("\n" + slice_cache.stats() + "\n")
+        sys.stdout.flush()
+
     # save data
     return dicomRenderer.return_data()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import json
+import hashlib
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.lazy_dicom import LazyDicomSlice, read_dicom_header
+
+INDEX_VERSION = 2
+
+# header values kept in the index
+INDEX_FIELDS = [
+    "InstanceNumber",
+    "CardiacNumberOfImages",
+    "AccessionNumber",
+    "PixelSpacing",
+    "RescaleSlope",
+    "RescaleIntercept",
+]
+
+def _to_builtin(value):
+    """
+    INPUT:
+        value:
+            a pydicom element value
+    OUTPUT:
+        the value as a json serializable python type
+    """
+    if isinstance(value, (list, tuple)) or type(value).__name__ == "MultiValue":
+        return [_to_builtin(x) for x in value]
+    elif isinstance(value, int):
+        return int(value)
+    elif isinstance(value, float):
+        return float(value)
+    else:
+        return str(value)
+
+def get_index_fields(dicom_slice):
+    """
+    INPUT:
+        dicom_slice:
+            a dicom object
+    OUTPUT:
+        dict of the indexed header values; None for absent tags
+    """
+    fields = {}
+    for name in INDEX_FIELDS:
+        value = getattr(dicom_slice, name, None)
+        fields[name] = None if value is None else _to_builtin(value)
+
+    return fields
+
+def get_cache_path(cache_dir, input_path, suffix, name=None):
+    """
+    INPUTS:
+        cache_dir:
+            directory of the cache files
+        input_path:
+            input dicom path
+        suffix:
+            the cache file suffix, e.g. .index.json
+        name:
+            file name prefix; if None, the study folder name
+    OUTPUT:
+        path of the cache file; unique to the absolute study path so
+        studies with the same folder name never share a cache
+    """
+    input_path = os.path.abspath(input_path)
+    path_hash = hashlib.sha1(input_path.encode("utf-8")).hexdigest()[:12]
+
+    if name is None:
+        name = os.path.basename(input_path)
+
+    return os.path.join(cache_dir, "{}_{}{}".format(name, path_hash, suffix))
+
+def file_key(path):
+    """
+    INPUT:
+        path:
+            path to a file
+    OUTPUT:
+        the size and modification time identifying the file contents
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def load_series_index(index_path):
+    """
+    INPUT:
+        index_path:
+            path to the index file
+    OUTPUT:
+        dict of the index; empty if missing, unreadable, or outdated
+    """
+    if not os.path.exists(index_path):
+        return {}
+
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+    if index.get("version") != INDEX_VERSION:
+        return {}
+
+    return index
+
+def save_series_index(index_path, dicom_lst, file_keys):
+    """
+    INPUT:
+        index_path:
+            path to the index file
+        dicom_lst:
+            sorted list of LazyDicomSlice objects
+        file_keys:
+            dict of path to (size, mtime)
+    EFFECT:
+        writes the index through a temporary file so it is never partial
+    """
+    index = {
+        "version": INDEX_VERSION,
+        "order": [x.path for x in dicom_lst],
+        "files": {},
+    }
+
+    for dicom_slice in dicom_lst:
+        size, mtime = file_keys[dicom_slice.path]
+        index["files"][dicom_slice.path] = {
+            "size": size,
+            "mtime": mtime,
+            "fields": get_index_fields(dicom_slice),
+            "pixel_layout": dicom_slice.pixel_layout,
+        }
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+def import_indexed_dicom(path_lst, index_path, workers=None):
+    """
+    INPUT:
+        path_lst:
+            list of all file paths in the series
+        index_path:
+            path to the index file
+        workers:
+            number of threads for reading changed files; if None, reads serially
+    OUTPUT:
+        sorted list of LazyDicomSlice objects; unchanged files are not opened
+    EFFECT:
+        updates the index file if any file was added, changed or removed
+    """
+    index = load_series_index(index_path)
+    cached_files = index.get("files", {})
+
+    # split files into unchanged and changed
+    file_keys = {}
+    dicom_dict = {}
+    changed_lst = []
+    for curr_path in path_lst:
+        file_keys[curr_path] = file_key(curr_path)
+
+        entry = cached_files.get(curr_path)
+        if entry is not None and (entry["size"], entry["mtime"]) == file_keys[curr_path]:
+            dicom_dict[curr_path] = LazyDicomSlice(curr_path, fields=entry["fields"], pixel_layout=entry["pixel_layout"])
+        else:
+            changed_lst.append(curr_path)
+
+    # read headers of changed files
+    if workers is None:
+        changed_dicom_lst = [read_dicom_header(x) for x in changed_lst]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            changed_dicom_lst = list(executor.map(read_dicom_header, changed_lst))
+
+    for dicom_slice in changed_dicom_lst:
+        dicom_dict[dicom_slice.path] = dicom_slice
+
+    # reuse stored order if nothing changed
+    if not changed_lst and sorted(index.get("order", [])) == sorted(dicom_dict):
+        return [dicom_dict[x] for x in index["order"]]
+
+    # sort and store
+    dicom_lst = sorted(dicom_dict.values(), key=lambda dicom: dicom.InstanceNumber)
+    save_series_index(index_path, dicom_lst, file_keys)
+
+    return dicom_lst
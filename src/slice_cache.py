@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+# import libraries
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+def decode_slice(dicom_slice):
+    """
+    INPUT:
+        dicom_slice:
+            a dicom object
+    OUTPUT:
+        the pixel array, without keeping it on the dicom object
+    """
+    if hasattr(dicom_slice, "load_pixel_array"):
+        return dicom_slice.load_pixel_array()
+
+    img = dicom_slice.pixel_array
+
+    # pydicom keeps the decoded array on the dataset, which the cache could
+    # then never free
+    dicom_slice._pixel_array = None
+    dicom_slice._pixel_id = {}
+
+    return img
+
+class SliceCache:
+    """
+    least recently used cache of decoded images bounded by memory budget
+    """
+    def __init__(self, dicom_lst, budget_bytes, workers=1):
+        # store inputs
+        self.dicom_lst = dicom_lst
+        self.budget_bytes = budget_bytes
+
+        # cached images and their total size
+        self.images = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+        # background decoding; index -> future of its decode
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.futures = {}
+
+    def get(self, indx):
+        """
+        INPUT:
+            indx:
+                index of dicom_lst
+        OUTPUT:
+            the decoded image; decoded on the calling thread if not cached
+        """
+        with self.lock:
+            if indx in self.images:
+                self.hits = self.hits + 1
+                self.images.move_to_end(indx)
+                return self.images[indx]
+
+            self.misses = self.misses + 1
+
+            # a queued decode of this image is done here instead
+            future = self.futures.get(indx)
+            if future is not None and future.cancel():
+                del self.futures[indx]
+                future = None
+
+        # wait for a running decode so the dicom object is not decoded twice
+        if future is not None:
+            wait([future])
+            with self.lock:
+                if indx in self.images:
+                    self.images.move_to_end(indx)
+                    return self.images[indx]
+
+        img = decode_slice(self.dicom_lst[indx])
+        self._put(indx, img)
+
+        return img
+
+    def prefetch(self, indx_lst):
+        """
+        INPUT:
+            indx_lst:
+                indicies to decode in the background, nearest first
+        EFFECT:
+            queues decodes of indx_lst and cancels queued decodes of images no
+            longer in it
+        """
+        indx_set = set(indx_lst)
+
+        with self.lock:
+            for indx in list(self.futures):
+                if indx not in indx_set and self.futures[indx].cancel():
+                    del self.futures[indx]
+                    self.cancelled = self.cancelled + 1
+
+            for indx in indx_lst:
+                if indx not in self.images and indx not in self.futures:
+                    self.futures[indx] = self.executor.submit(self._prefetch_one, indx)
+
+    def close(self):
+        """
+        EFFECT:
+            stops background decoding
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """
+        OUTPUT:
+            string summary of cache hits and misses
+        """
+        return "slice cache: {} hits, {} misses, {} cancelled prefetches, {} images ({:.1f} MB)".format(
+            self.hits, self.misses, self.cancelled, len(self.images), self.nbytes / 2**20)
+
+    def _prefetch_one(self, indx):
+        """
+        EFFECT:
+            decodes and caches a single image
+        """
+        try:
+            if indx not in self.images:
+                self._put(indx, decode_slice(self.dicom_lst[indx]))
+        finally:
+            with self.lock:
+                del self.futures[indx]
+
+    def _put(self, indx, img):
+        """
+        EFFECT:
+            adds image and evicts least recently used images over budget
+        """
+        with self.lock:
+            if indx in self.images:
+                return
+
+            self.images[indx] = img
+            self.nbytes = self.nbytes + img.nbytes
+
+            # always keep the newest image
+            while self.nbytes > self.budget_bytes and len(self.images) > 1:
+                _, old_img = self.images.popitem(last=False)
+                self.nbytes = self.nbytes - old_img.nbytes
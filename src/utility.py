@@ -8,7 +8,10 @@ import bisect
 import shutil
 import pydicom as dicom
 
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from src.lazy_dicom import LazyDicomSlice, read_dicom_header
+from src.series_index import import_indexed_dicom
 
 REGEX_PARSE = re.compile("([aA-zZ]+)")
 
@@ -22,7 +25,7 @@ def import_anatomic_settings(path):
     """
     try:
         with open(path, "r") as f:
-            data = yaml.load(f)
+            data = yaml.safe_load(f)
             return(data)
     except:
         raise IOError("Problem loading: " + str(path))
@@ -49,13 +52,13 @@ def sort_dicom_list(dicom_lst):
     """
 
     # test that all elements of the list are dicom objects
-    if not all([True if type(x) == dicom.dataset.FileDataset else False for x in dicom_lst]):
+    if not all([True if type(x) in (dicom.dataset.FileDataset, LazyDicomSlice) else False for x in dicom_lst]):
         raise AssertionError("Not all elements are dicom images")
 
     # sort
     return sorted(dicom_lst, key=lambda dicom: dicom.InstanceNumber)
 
-def recursive_read_dicom(curr_path):
+def recursive_read_dicom(curr_path, reader=dicom.read_file):
     """
     recursively reads in dicom files from unarchived file
     """
@@ -63,26 +66,89 @@ def recursive_read_dicom(curr_path):
     for curr_f in os.listdir(curr_path):
         tmp_path = os.path.join(curr_path, curr_f)
         if os.path.isdir(tmp_path):
-            tmp_lst = tmp_lst + recursive_read_dicom(tmp_path)
+            tmp_lst = tmp_lst + recursive_read_dicom(tmp_path, reader)
         else:
             # read in dicom
-            curr_dicom_f = dicom.read_file(tmp_path)
+            curr_dicom_f = reader(tmp_path)
 
             tmp_lst.append(curr_dicom_f)
 
     return tmp_lst
 
-def import_dicom(input_path):
+def scan_dicom_paths(curr_path):
+    """
+    INPUT:
+        curr_path:
+            root directory of the dicom series
+    OUTPUT:
+        list of all file paths under curr_path
+    """
+    path_lst = []
+    dir_stack = [curr_path]
+
+    # walk directories without recursion; scandir avoids an extra stat per entry
+    while dir_stack:
+        with os.scandir(dir_stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir():
+                    dir_stack.append(entry.path)
+                else:
+                    path_lst.append(entry.path)
+
+    return path_lst
+
+def parallel_read_dicom(curr_path, workers, reader=dicom.read_file):
+    """
+    INPUT:
+        curr_path:
+            root directory of the dicom series
+        workers:
+            number of threads used to parse files
+        reader:
+            function reading a single file path
+    OUTPUT:
+        list of dicom objects read with a bounded thread pool
+    """
+    if workers < 1:
+        raise AssertionError("Must have at least one worker. Got {}".format(workers))
+
+    # get all files
+    path_lst = scan_dicom_paths(curr_path)
+
+    # parse files; reading is mostly I/O wait so threads overlap well
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(reader, path_lst))
+
+def import_dicom(input_path, workers=None, lazy=False, index_path=None):
     """
     INPUT:
         input_path:
             input dicom path
+        workers:
+            number of threads for reading; if None, reads serially
+        lazy:
+            if True, reads headers only and decodes pixels on first access
+        index_path:
+            optional series index file; unchanged files skip header parsing
+            and images are decoded on first access
     OUTPUT:
         sorted dicom object
     """
+    # use persistent index if specified
+    if index_path is not None:
+        return import_indexed_dicom(scan_dicom_paths(input_path), index_path, workers)
+
+    # determine how to read each file
+    if lazy:
+        reader = read_dicom_header
+    else:
+        reader = dicom.read_file
 
     # read in all dicoms
-    dicom_lst = recursive_read_dicom(input_path)
+    if workers is None:
+        dicom_lst = recursive_read_dicom(input_path, reader)
+    else:
+        dicom_lst = parallel_read_dicom(input_path, workers, reader)
 
     # sort dicoms
     dicom_lst = sort_dicom_list(dicom_lst)
@@ -105,6 +171,8 @@ def save_output(input_path, case_id, out_data, click_df, cmd_args, replace):
     EFFECT:
         either creates a path or uses specified path to make output
     """
+    import pandas as pd
+
     # assert out_data is pandas dataframe
     if not isinstance(out_data, pd.DataFrame):
         raise TypeError("out data is not dataframe")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+# import libraries
+import os
+import json
+
+import numpy as np
+
+from math import ceil
+
+from src.slice_cache import decode_slice
+from src.series_index import get_cache_path, file_key
+
+def get_volume_cache_path(cache_dir, input_path, u_id):
+    """
+    INPUT:
+        cache_dir:
+            directory of the cache files
+        input_path:
+            input dicom path
+        u_id:
+            the unique id of the study
+    OUTPUT:
+        path of the .npy cache file
+    """
+    return get_cache_path(cache_dir, input_path, ".volume.npy", u_id)
+
+def get_series_manifest(dicom_lst):
+    """
+    INPUT:
+        dicom_lst:
+            sorted list of dicom objects
+    OUTPUT:
+        list of [absolute path, size, mtime] of every file in series order
+    """
+    manifest = []
+    for dicom_slice in dicom_lst:
+        file_path = os.path.abspath(getattr(dicom_slice, "path", None) or dicom_slice.filename)
+        manifest.append([file_path] + list(file_key(file_path)))
+
+    return manifest
+
+def _manifest_path(cache_path):
+    """
+    OUTPUT:
+        path of the manifest stored next to the cache file
+    """
+    return cache_path + ".json"
+
+def get_cine_series(dicom_lst):
+    """
+    INPUT:
+        dicom_lst:
+            sorted list of dicom objects
+    OUTPUT:
+        number of cine frames per slice; None if not a cine series
+    """
+    cine_series = int(getattr(dicom_lst[0], "CardiacNumberOfImages", 1) or 1)
+
+    if cine_series == 1:
+        return None
+
+    return cine_series
+
+def build_volume_cache(dicom_lst, cache_path):
+    """
+    INPUT:
+        dicom_lst:
+            sorted list of dicom objects
+        cache_path:
+            path of the .npy cache file
+    OUTPUT:
+        read only memory map shaped (slice, cine, rows, cols)
+    EFFECT:
+        decodes every image once and writes it to cache_path, with the
+        manifest of the files it was built from next to it
+    """
+    # invalidate first so an interrupted build is never matched
+    if os.path.exists(_manifest_path(cache_path)):
+        os.remove(_manifest_path(cache_path))
+
+    # files as they were before decoding
+    manifest = get_series_manifest(dicom_lst)
+
+    cine_series = get_cine_series(dicom_lst) or 1
+
+    # determine shape from first image
+    first_img = decode_slice(dicom_lst[0])
+    shape = (ceil(len(dicom_lst)/cine_series), cine_series) + first_img.shape
+
+    # write through temporary file so an interrupted build is never reused
+    tmp_path = cache_path + ".tmp.npy"
+    volume = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=first_img.dtype, shape=shape)
+
+    for indx, dicom_slice in enumerate(dicom_lst):
+        img = first_img if indx == 0 else decode_slice(dicom_slice)
+        volume[indx // cine_series, indx % cine_series] = img
+
+    volume.flush()
+    del volume
+    os.replace(tmp_path, cache_path)
+
+    # write manifest last
+    tmp_path = _manifest_path(cache_path) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, _manifest_path(cache_path))
+
+    return np.load(cache_path, mmap_mode="r")
+
+def open_volume_cache(dicom_lst, cache_path):
+    """
+    INPUT:
+        dicom_lst:
+            sorted list of dicom objects
+        cache_path:
+            path of the .npy cache file
+    OUTPUT:
+        read only memory map shaped (slice, cine, rows, cols); built if the
+        cache is missing or any file was added, removed or changed
+    """
+    if os.path.exists(cache_path):
+        try:
+            with open(_manifest_path(cache_path), "r") as f:
+                manifest = json.load(f)
+        except (IOError, ValueError):
+            manifest = None
+
+        # check files match those the cache was built from
+        if manifest != get_series_manifest(dicom_lst):
+            volume = None
+        else:
+            try:
+                volume = np.load(cache_path, mmap_mode="r")
+            except (IOError, ValueError):
+                volume = None
+
+        # check cache matches series
+        cine_series = get_cine_series(dicom_lst) or 1
+        if volume is not None and volume.ndim == 4:
+            valid_shape = (
+                volume.shape[0] == ceil(len(dicom_lst)/cine_series) and
+                volume.shape[1] == cine_series and
+                volume.shape[2:] == (int(dicom_lst[0].Rows), int(dicom_lst[0].Columns))
+            )
+            if valid_shape:
+                return volume
+
+    return build_volume_cache(dicom_lst, cache_path)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+# import libraries
+import numpy as np
+
+# import user defined functions
+from src.utility import import_dicom
+from src.process_roi import get_roi_mask
+from src.process_calcium import get_calcium_measurements
+from benchmarks.common import make_lasso
+from benchmarks.synthetic_dicom import write_dicom, CT_SOP_CLASS, CT_INTERCEPT
+
+N_SLICES = 12
+LESION_SLICE = 7
+
+def make_ct(root_path):
+    """
+    OUTPUT:
+        path of a 64x64 CT series with one calcified lesion on LESION_SLICE
+    """
+    for i in range(N_SLICES):
+        hu_img = np.zeros([64, 64])
+        if i == LESION_SLICE:
+            hu_img[30:36, 30:36] = 400
+
+        write_dicom(str(root_path / "CT{:05d}.dcm".format(i)), hu_img - CT_INTERCEPT, CT_SOP_CLASS,
+            InstanceNumber=i + 1,
+            CardiacNumberOfImages=1,
+            PixelSpacing=[0.5, 0.5],
+            SliceThickness=3,
+            RescaleSlope=1,
+            RescaleIntercept=CT_INTERCEPT,
+        )
+
+    return str(root_path)
+
+def test_lesion_slice_is_series_index(tmp_path):
+    dicom_lst = import_dicom(make_ct(tmp_path))
+
+    # roi starts partway into the stack
+    roi_mask = get_roi_mask(make_lasso((32, 32), 12), (64, 64), (5, 10))
+
+    for scoring in ["slice", "lesion"]:
+        ca_score, ca_vol, lesion_df = get_calcium_measurements(roi_mask, dicom_lst, scoring=scoring, return_lesions=True)
+
+        assert len(lesion_df) == 1
+        assert lesion_df["slice"].tolist() == [LESION_SLICE]
+        assert ca_score == lesion_df["score"].sum()
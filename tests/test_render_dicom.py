@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+# import libraries
+import io
+import contextlib
+
+import yaml
+import numpy as np
+import matplotlib
+
+matplotlib.use("Agg")
+
+from pydicom.dataset import Dataset
+from matplotlib import pyplot
+
+# import user defined functions
+from src.renderDicom import RenderDicomSeries
+
+N_SLICES = 4
+CINE_SERIES = 20
+
+SETTINGS = {
+    "anatomic_landmarks": {"a": "APEX", "b": "BASE"},
+    "roi_landmarks": ["LAD"],
+}
+
+class Event:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+def make_renderer(tmp_path):
+    """
+    OUTPUT:
+        renderer of a blank header only cine series on an Agg figure
+    """
+    settings_path = str(tmp_path / "settings.yaml")
+    with open(settings_path, "w") as f:
+        yaml.safe_dump(SETTINGS, f)
+
+    dicom_lst = []
+    for _ in range(N_SLICES * CINE_SERIES):
+        ds = Dataset()
+        ds.CardiacNumberOfImages = CINE_SERIES
+        dicom_lst.append(ds)
+
+    volume = np.zeros([N_SLICES, CINE_SERIES, 64, 64], dtype=np.int16)
+
+    fig, ax = pyplot.subplots(1)
+    return RenderDicomSeries(ax, dicom_lst, settings_path, volume=volume)
+
+def click_and_reset(renderer, frame, rng):
+    """
+    EFFECT:
+        marks APEX twice on frame, then clears it
+    """
+    renderer._update_image(frame)
+    for _ in range(2):
+        renderer._on_click(Event(button=1, xdata=float(rng.uniform(0, 64)), ydata=float(rng.uniform(0, 64)), x=0, y=0))
+    renderer._on_key_press(Event(key="delete"))
+
+def test_patch_count_bounded_after_clicks(tmp_path):
+    rng = np.random.default_rng(0)
+
+    # the viewer reports every event on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        renderer = make_renderer(tmp_path)
+
+        # one marked frame predicts a circle on every other frame
+        renderer._on_key_press(Event(key="a"))
+        renderer._on_click(Event(button=1, xdata=32., ydata=32., x=0, y=0))
+        assert len(renderer.ax.patches) == CINE_SERIES
+
+        # marking, re-marking and clearing frames moves existing circles
+        for frame in rng.integers(1, CINE_SERIES, size=100):
+            click_and_reset(renderer, int(frame), rng)
+            assert len(renderer.ax.patches) == CINE_SERIES
+
+    pyplot.close("all")